@@ -7,6 +7,11 @@ params = {
         "requirements_path": {
             "type": "string",
             "description": "Optional. The path to the requirements.txt file. Defaults to 'requirements.txt' in the project root.",
+        },
+        "packages": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Optional. Package specifiers to install directly (e.g., ['requests', 'flask==3.0.0']). All are installed in a single pip run. If given, 'requirements_path' is ignored.",
         }
     },
     "required": [],
@@ -14,7 +19,7 @@ params = {
 
 blueprint = Blueprint(
     id="pip_install",
-    description="Installs Python packages from a requirements.txt file. If a 'venv' directory does not exist in the project root, it will be created automatically.",
+    description="Installs Python packages from a requirements.txt file, or a list of packages in one pip run. If a 'venv' directory does not exist in the project root, it will be created automatically.",
     parameters=params,
     action_function_name="pip_install"
 )
\ No newline at end of file
@@ -0,0 +1,23 @@
+# blueprints/pip_install_many_bp.py
+from src.foundry.blueprints import Blueprint
+
+params = {
+    "type": "object",
+    "properties": {
+        "requirement_files": {
+            "type": "array",
+            "items": {
+                "type": "string"
+            },
+            "description": "The requirements files to install, e.g., ['requirements.txt', 'requirements-dev.txt'].",
+        }
+    },
+    "required": ["requirement_files"],
+}
+
+blueprint = Blueprint(
+    id="pip_install_many",
+    description="Installs Python packages from several requirements files at once in a single pip run. Prefer this over calling 'pip_install' once per file.",
+    parameters=params,
+    action_function_name="pip_install_many"
+)
@@ -0,0 +1,26 @@
+# blueprints/run_pipeline_bp.py
+from src.foundry.blueprints import Blueprint
+
+params = {
+    "type": "object",
+    "properties": {
+        "steps": {
+            "type": "array",
+            "items": {
+                "type": "array",
+                "items": {
+                    "type": "string"
+                }
+            },
+            "description": "The commands to run in order, each as a list of arguments, e.g., [['pip', 'install', '-r', 'requirements.txt'], ['python', '-m', 'pytest', '-q']].",
+        }
+    },
+    "required": ["steps"],
+}
+
+blueprint = Blueprint(
+    id="run_pipeline",
+    description="Runs a sequence of short-lived, non-interactive commands from the project's root directory in one call, stopping at the first failure. The project's virtual environment is used for `python`, `pip` and any tool installed into it. Prefer this over several `run_shell_command` calls for setup-then-test sequences.",
+    parameters=params,
+    action_function_name="run_pipeline"
+)
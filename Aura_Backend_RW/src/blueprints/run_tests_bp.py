@@ -3,7 +3,16 @@ from src.foundry.blueprints import Blueprint
 
 params = {
     "type": "object",
-    "properties": {},
+    "properties": {
+        "fast_fail": {
+            "type": "boolean",
+            "description": "Stop at the first failing test. Defaults to true; set to false to see every failure.",
+        },
+        "parallel": {
+            "type": "boolean",
+            "description": "Run tests across all CPU cores when pytest-xdist is installed. Defaults to true.",
+        }
+    },
     "required": []
 }
 
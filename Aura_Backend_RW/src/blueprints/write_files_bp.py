@@ -0,0 +1,38 @@
+# blueprints/write_files_bp.py
+from src.foundry.blueprints import Blueprint
+
+params = {
+    "type": "object",
+    "properties": {
+        "files": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "The path of the file to write to."
+                    },
+                    "content": {
+                        "type": "string",
+                        "description": "Pre-defined content for this file. If you use this, do not use `task_description`."
+                    },
+                    "task_description": {
+                        "type": "string",
+                        "description": "A detailed, clear, and specific description of the code to be generated for this file. Use this ONLY when you want the AI to generate code."
+                    }
+                },
+                "required": ["path"]
+            },
+            "description": "The files to write, each with a `path` and either `content` or a `task_description`.",
+        }
+    },
+    "required": ["files"],
+}
+
+blueprint = Blueprint(
+    id="write_files",
+    description="Writes several files in one step. Files with a `task_description` are generated together by one AI call, so use this only for files that do not depend on each other's contents (e.g., independent modules or tests); otherwise use 'write_file' once per file. Creates directories if needed and overwrites existing files.",
+    parameters=params,
+    action_function_name="write_files"
+)
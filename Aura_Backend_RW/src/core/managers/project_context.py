@@ -1,5 +1,5 @@
 # core/managers/project_context.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
@@ -10,4 +10,13 @@ class ProjectContext:
     """
     project_root: Path
     venv_python_path: Optional[Path] = None
-    venv_pip_path: Optional[Path] = None
\ No newline at end of file
+    venv_pip_path: Optional[Path] = None
+    # String forms of the venv paths, for building subprocess commands.
+    venv_python_str: Optional[str] = field(init=False, default=None)
+    venv_pip_str: Optional[str] = field(init=False, default=None)
+
+    def __post_init__(self):
+        if self.venv_python_path:
+            object.__setattr__(self, "venv_python_str", str(self.venv_python_path))
+        if self.venv_pip_path:
+            object.__setattr__(self, "venv_pip_str", str(self.venv_pip_path))
\ No newline at end of file
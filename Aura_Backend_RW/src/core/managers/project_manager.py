@@ -1,5 +1,6 @@
 # src/core/managers/project_manager.py
 import logging
+import os
 import shutil
 from pathlib import Path
 from datetime import datetime
@@ -162,10 +163,13 @@ class ProjectManager:
         logger.info(f"Project loaded: {self.active_project_path}")
         return str(self.active_project_path)
 
-    def get_project_files(self) -> dict[str, str]:
-        """Reads all relevant text files from the project directory."""
-        if not self.active_project_path: return {}
-        project_files = {}
+    def list_project_files(self) -> List[str]:
+        """
+        Returns the sorted relative (POSIX) paths of the relevant text files in
+        the project, without reading them. Ignored directories such as .venv are
+        pruned rather than walked.
+        """
+        if not self.active_project_path: return []
         ignore_dirs = {'.git', '.venv', 'venv', '__pycache__', 'node_modules', 'dist', 'build', 'rag_db'}
         allowed_extensions = {
             '.py', '.md', '.txt', '.json', '.toml', '.ini', '.cfg', '.yaml', '.yml',
@@ -173,14 +177,28 @@ class ProjectManager:
         }
         common_filenames = {'Dockerfile', '.gitignore', '.env'}
 
-        for item in self.active_project_path.rglob('*'):
-            if any(part in ignore_dirs for part in item.relative_to(self.active_project_path).parts):
-                continue
-            if item.is_file() and (item.suffix.lower() in allowed_extensions or item.name in common_filenames):
-                try:
-                    project_files[item.relative_to(self.active_project_path).as_posix()] = item.read_text(encoding='utf-8', errors='ignore')
-                except Exception:
-                    pass
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(self.active_project_path):
+            dirnames[:] = [d for d in dirnames if d not in ignore_dirs]
+            rel_dir = Path(dirpath).relative_to(self.active_project_path)
+            for name in filenames:
+                if os.path.splitext(name)[1].lower() in allowed_extensions or name in common_filenames:
+                    paths.append((rel_dir / name).as_posix())
+        return sorted(paths)
+
+    def get_file_listing(self) -> str:
+        """The project's relevant files, one path per line, as embedded in agent prompts."""
+        return "\n".join(self.list_project_files())
+
+    def get_project_files(self) -> dict[str, str]:
+        """Reads all relevant text files from the project directory."""
+        if not self.active_project_path: return {}
+        project_files = {}
+        for relative_path in self.list_project_files():
+            try:
+                project_files[relative_path] = (self.active_project_path / relative_path).read_text(encoding='utf-8', errors='ignore')
+            except Exception:
+                pass
         return project_files
 
     def read_file(self, relative_path: str) -> Optional[str]:
@@ -17,6 +17,7 @@ from src.services import (
     ConductorService, ToolRunnerService, VectorContextService, CodeIntelligenceService
 )
 from src.foundry import FoundryManager
+from src.foundry.actions import web_actions
 from src.events import ProjectCreated
 
 if TYPE_CHECKING:
@@ -139,6 +140,9 @@ class ServiceManager:
     async def shutdown(self):
         self.log_to_event_bus("info", "[ServiceManager] Shutting down services...")
         self.terminate_background_servers()
+        if self.vector_context_service:
+            await self.vector_context_service.await_pending_reindex()
+        await web_actions.close_session()
         self.log_to_event_bus("info", "[ServiceManager] Services shutdown complete")
 
     def get_llm_client(self) -> LLMClient:
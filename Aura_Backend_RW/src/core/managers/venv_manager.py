@@ -19,24 +19,32 @@ class VenvManager:
 
     def __init__(self, project_path: Path):
         self.project_path = project_path
+        # Executables found so far. Only hits are cached, so a venv created later is
+        # still noticed; create_venv() clears them.
+        self._python_path: Optional[Path] = None
+        self._pip_path: Optional[Path] = None
 
     @property
     def python_path(self) -> Optional[Path]:
         """Returns the path to the Python executable within the venv."""
-        venv_dir = self.project_path / ".venv"
-        if not venv_dir.is_dir():
-            return None
-        python_exe = venv_dir / "Scripts" / "python.exe" if sys.platform == "win32" else venv_dir / "bin" / "python"
-        return python_exe if python_exe.exists() else None
+        if self._python_path is None:
+            venv_dir = self.project_path / ".venv"
+            python_exe = venv_dir / "Scripts" / "python.exe" if sys.platform == "win32" else venv_dir / "bin" / "python"
+            if python_exe.exists():
+                self._python_path = python_exe
+        return self._python_path
 
     @property
     def pip_path(self) -> Optional[Path]:
         """Returns the path to the pip executable within the venv."""
-        python_exe = self.python_path
-        if not python_exe:
-            return None
-        pip_exe = python_exe.parent / "pip.exe" if sys.platform == "win32" else python_exe.parent / "pip"
-        return pip_exe if pip_exe.exists() else None
+        if self._pip_path is None:
+            python_exe = self.python_path
+            if not python_exe:
+                return None
+            pip_exe = python_exe.parent / "pip.exe" if sys.platform == "win32" else python_exe.parent / "pip"
+            if pip_exe.exists():
+                self._pip_path = pip_exe
+        return self._pip_path
 
     @property
     def is_active(self) -> bool:
@@ -58,6 +66,7 @@ class VenvManager:
         """Creates a new virtual environment for the project."""
         venv_path = self.project_path / ".venv"
         logger.info(f"Attempting to create virtual environment at: {venv_path}")
+        self._python_path = self._pip_path = None
         try:
             base_python = self._get_base_python_executable()
             logger.info(f"Creating virtual environment using: {base_python}")
@@ -6,14 +6,20 @@ overwriting existing code.
 """
 import ast
 import logging
+import re
 from typing import List
 from pathlib import Path
 
+from src.foundry.ast_utils import (
+    ParsedSource, append_top_level_source, fast_unparse, insert_top_level_source, load_tree, node_span,
+    run_in_ast_pool, serialize_by_path, splice_node, take_tree, write_source,
+)
 from src.services import VectorContextService, CodeIntelligenceService
 
 logger = logging.getLogger(__name__)
 
 
+@serialize_by_path
 async def add_class_to_file(path: str, class_code: str, vector_context_service: VectorContextService, code_intelligence_service: CodeIntelligenceService) -> str:
     """
     Parses a Python file, adds a new class to it, and writes the result back.
@@ -31,7 +37,8 @@ async def add_class_to_file(path: str, class_code: str, vector_context_service:
             return f"Successfully created new file {path} with the provided class."
 
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
+        parsed = await run_in_ast_pool(take_tree, content)
+        tree = parsed.tree
         new_class_tree = ast.parse(class_code)
 
         new_class_def = next((node for node in new_class_tree.body if isinstance(node, ast.ClassDef)), None)
@@ -39,18 +46,21 @@ async def add_class_to_file(path: str, class_code: str, vector_context_service:
         if not new_class_def:
             return "Error: The provided `class_code` did not contain a valid class definition."
 
-        class_replaced = False
-        for i, existing_node in enumerate(tree.body):
-            if isinstance(existing_node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)) and existing_node.name == new_class_def.name:
-                tree.body[i] = new_class_def
-                class_replaced = True
-                break
+        existing_index = parsed.find(new_class_def.name)
+        class_replaced = existing_index is not None
 
-        if not class_replaced:
+        if class_replaced:
+            span = node_span(content, tree.body[existing_index])
+            tree.body[existing_index] = new_class_def
+            new_code = await run_in_ast_pool(splice_node, content, span, new_class_def, tree)
+        else:
             tree.body.append(new_class_def)
-
-        new_code = ast.unparse(tree)
-        path_obj.write_text(new_code, encoding='utf-8')
+            new_code = append_top_level_source(content, fast_unparse(new_class_def))
+        if new_code == content:
+            return f"No changes required in '{path}'."
+        # Release the parsed tree and original source before the write/reindex awaits.
+        del parsed, tree, content
+        await write_source(path_obj, new_code)
         await vector_context_service.reindex_file(path_obj, new_code)
         await code_intelligence_service.update_index_for_file(path_obj, new_code)
 
@@ -63,6 +73,7 @@ async def add_class_to_file(path: str, class_code: str, vector_context_service:
         return f"An unexpected error occurred while adding class: {e}"
 
 
+@serialize_by_path
 async def add_function_to_file(path: str, function_code: str, vector_context_service: VectorContextService, code_intelligence_service: CodeIntelligenceService) -> str:
     """
     Parses a Python file, adds a new function to it, and writes the result back.
@@ -79,7 +90,8 @@ async def add_function_to_file(path: str, function_code: str, vector_context_ser
             return f"Successfully created new file {path} with the provided function."
 
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
+        parsed = await run_in_ast_pool(take_tree, content)
+        tree = parsed.tree
         new_function_tree = ast.parse(function_code)
 
         new_function_def = next((node for node in new_function_tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))), None)
@@ -87,18 +99,20 @@ async def add_function_to_file(path: str, function_code: str, vector_context_ser
         if not new_function_def:
             return "Error: The provided `function_code` did not contain a valid function definition."
 
-        function_replaced = False
-        for i, existing_node in enumerate(tree.body):
-            if isinstance(existing_node, (ast.FunctionDef, ast.AsyncFunctionDef)) and existing_node.name == new_function_def.name:
-                tree.body[i] = new_function_def
-                function_replaced = True
-                break
+        existing_index = parsed.find(new_function_def.name, (ast.FunctionDef, ast.AsyncFunctionDef))
+        function_replaced = existing_index is not None
 
-        if not function_replaced:
+        if function_replaced:
+            span = node_span(content, tree.body[existing_index])
+            tree.body[existing_index] = new_function_def
+            new_code = await run_in_ast_pool(splice_node, content, span, new_function_def, tree)
+        else:
             tree.body.append(new_function_def)
-
-        new_code = ast.unparse(tree)
-        path_obj.write_text(new_code, encoding='utf-8')
+            new_code = append_top_level_source(content, fast_unparse(new_function_def))
+        if new_code == content:
+            return f"No changes required in '{path}'."
+        del parsed, tree, content
+        await write_source(path_obj, new_code)
         await vector_context_service.reindex_file(path_obj, new_code)
         await code_intelligence_service.update_index_for_file(path_obj, new_code)
 
@@ -110,6 +124,7 @@ async def add_function_to_file(path: str, function_code: str, vector_context_ser
         return f"An unexpected error occurred while adding function: {e}"
 
 
+@serialize_by_path
 async def add_method_to_class(path: str, class_name: str, name: str, args: list, vector_context_service: VectorContextService, code_intelligence_service: CodeIntelligenceService, is_async: bool = False) -> str:
     """
     Adds an empty method to a class in a given file.
@@ -120,8 +135,10 @@ async def add_method_to_class(path: str, class_name: str, name: str, args: list,
         return f"Error: File not found at '{path}'."
     try:
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
-        class_node = next((node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == class_name), None)
+        parsed = await run_in_ast_pool(take_tree, content)
+        tree = parsed.tree
+        class_index = parsed.find(class_name, (ast.ClassDef,))
+        class_node = tree.body[class_index] if class_index is not None else None
 
         if not class_node:
             return f"Error: Class '{class_name}' not found in '{path}'."
@@ -129,14 +146,19 @@ async def add_method_to_class(path: str, class_name: str, name: str, args: list,
         arguments = ast.arguments(args=[ast.arg(arg=arg_name) for arg_name in args], posonlyargs=[], kwonlyargs=[], kw_defaults=[], defaults=[])
         method_body = [ast.Pass()]
 
+        span = node_span(content, class_node)
         new_method = ast.AsyncFunctionDef(name=name, args=arguments, body=method_body, decorator_list=[]) if is_async else ast.FunctionDef(name=name, args=arguments, body=method_body, decorator_list=[])
 
         if len(class_node.body) == 1 and isinstance(class_node.body[0], ast.Pass):
             class_node.body = []
 
         class_node.body.append(new_method)
-        new_code = ast.unparse(tree)
-        path_obj.write_text(new_code, encoding='utf-8')
+        ast.fix_missing_locations(tree)
+        new_code = await run_in_ast_pool(splice_node, content, span, class_node, tree)
+        if new_code == content:
+            return f"No changes required in '{path}'."
+        del parsed, tree, content
+        await write_source(path_obj, new_code)
         await vector_context_service.reindex_file(path_obj, new_code)
         await code_intelligence_service.update_index_for_file(path_obj, new_code)
 
@@ -147,6 +169,33 @@ async def add_method_to_class(path: str, class_name: str, name: str, args: list,
         return f"An unexpected error occurred while adding method: {e}"
 
 
+def _import_present_in_text(content: str, module: str, names: List[str]) -> bool:
+    """
+    Cheap textual check for an existing top-level import. Only single-line
+    imports are recognised, so a False result is inconclusive; a True result
+    may come from a line inside a docstring or other string literal, so it
+    must be confirmed with `_import_present`.
+    """
+    if not names:
+        pattern = re.compile(rf"(?m)^import\s+(?:[\w.]+(?:\s+as\s+\w+)?\s*,\s*)*{re.escape(module)}(?:\s+as\s+\w+)?\s*(?:,|#|$)")
+        return pattern.search(content) is not None
+
+    pattern = re.compile(rf"(?m)^from\s+{re.escape(module)}\s+import\s+([^(\\\n#]+)")
+    imported = set()
+    for match in pattern.finditer(content):
+        for item in match.group(1).split(','):
+            imported.add(item.split(' as ')[0].strip())
+    return set(names).issubset(imported)
+
+
+def _import_present(parsed: ParsedSource, module: str, names: List[str]) -> bool:
+    """Whether the parsed module already has the import at top level."""
+    if not names:
+        return module in parsed.imports_direct
+    return set(names).issubset(parsed.imports_from.get(module, ()))
+
+
+@serialize_by_path
 async def add_import(path: str, module: str, names: List[str] = [], vector_context_service: VectorContextService = None, code_intelligence_service: CodeIntelligenceService = None) -> str:
     """
     Adds an import statement to a Python file if it doesn't already exist.
@@ -157,14 +206,18 @@ async def add_import(path: str, module: str, names: List[str] = [], vector_conte
         return f"Error: File not found at '{path}'."
     try:
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
+        already_present = (f"Import 'from {module} import {', '.join(names)}' already satisfied in '{path}'." if names
+                           else f"Import 'import {module}' already exists in '{path}'.")
+        # A textual match is confirmed against the (cached, read-only) parse's import index.
+        if _import_present_in_text(content, module, names) and _import_present(await run_in_ast_pool(load_tree, content), module, names):
+            return already_present
+
+        parsed = await run_in_ast_pool(take_tree, content)
+        tree = parsed.tree
 
         # Check for existing imports
-        for node in tree.body:
-            if isinstance(node, ast.Import) and not names and any(alias.name == module for alias in node.names):
-                return f"Import 'import {module}' already exists in '{path}'."
-            elif isinstance(node, ast.ImportFrom) and names and node.module == module and set(names).issubset({alias.name for alias in node.names}):
-                return f"Import 'from {module} import {', '.join(names)}' already satisfied in '{path}'."
+        if _import_present(parsed, module, names):
+            return already_present
 
         import_node = ast.ImportFrom(module=module, names=[ast.alias(name=n) for n in names], level=0) if names else ast.Import(names=[ast.alias(name=module)])
         import_str = f"from {module} import {', '.join(names)}" if names else f"import {module}"
@@ -175,9 +228,14 @@ async def add_import(path: str, module: str, names: List[str] = [], vector_conte
                 break
             insert_pos = i + 1
 
+        new_code = insert_top_level_source(content, tree, insert_pos, import_str)
         tree.body.insert(insert_pos, import_node)
-        new_code = ast.unparse(tree)
-        path_obj.write_text(new_code, encoding='utf-8')
+        if new_code is None:
+            new_code = fast_unparse(tree)
+        if new_code == content:
+            return f"No changes required in '{path}'."
+        del parsed, tree, content
+        await write_source(path_obj, new_code)
         await vector_context_service.reindex_file(path_obj, new_code)
         await code_intelligence_service.update_index_for_file(path_obj, new_code)
 
@@ -6,6 +6,8 @@ These tools are for understanding code structure and content.
 import ast
 import logging
 
+from src.foundry.ast_utils import load_tree, node_span
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,7 +47,7 @@ def list_functions_in_file(path: str) -> str:
         return error_msg
 
     try:
-        tree = ast.parse(content)
+        tree = load_tree(content).tree
         function_names = [
             node.name for node in tree.body
             if isinstance(node, ast.FunctionDef)
@@ -89,12 +91,15 @@ def get_code_for(path: str, function_name: str) -> str:
         return f"Error reading file at '{path}': {e}"
 
     try:
-        tree = ast.parse(content)
-        for node in tree.body:
-            if isinstance(node, (ast.FunctionDef, ast.ClassDef)) and node.name == function_name:
-                source_code = ast.unparse(node)
-                logger.info(f"Successfully extracted source code for '{function_name}'.")
-                return f"Source code for '{function_name}' from '{path}':\n```python\n{source_code}\n```"
+        parsed = load_tree(content)
+        index = parsed.find(function_name, (ast.FunctionDef, ast.ClassDef))
+        if index is not None:
+            node = parsed.tree.body[index]
+            # Slice the original text so comments and formatting are preserved.
+            span = node_span(content, node)
+            source_code = content[span[0]:span[1]] if span else ast.unparse(node)
+            logger.info(f"Successfully extracted source code for '{function_name}'.")
+            return f"Source code for '{function_name}' from '{path}':\n```python\n{source_code}\n```"
 
         not_found_msg = f"Error: Node '{function_name}' not found as a top-level function or class in '{path}'."
         logger.warning(not_found_msg)
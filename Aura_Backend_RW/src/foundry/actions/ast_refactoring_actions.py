@@ -6,14 +6,60 @@ logic to functions.
 """
 import ast
 import logging
-from typing import Optional
+import re
+from typing import Optional, Tuple
 from pathlib import Path
 
+from src.foundry.ast_utils import (
+    ParsedSource, RenameTransformer, fast_unparse, line_indent, node_span, rename_in_source,
+    run_in_ast_pool, serialize_by_path, splice_node, take_tree, write_source,
+)
 from src.services import VectorContextService, CodeIntelligenceService
 
 logger = logging.getLogger(__name__)
 
+_FUNCTION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
 
+# Default values the LLM passes most often, resolved without ast.literal_eval.
+_QUICK_LITERALS = {'None': None, 'True': True, 'False': False, '()': (), '[]': [], '{}': {}}
+_INT_LITERAL = re.compile(r'-?(?:0|[1-9][0-9]*)')
+_SIMPLE_STRING_LITERAL = re.compile(r'"[^"\\\n]*"' r"|'[^'\\\n]*'")
+
+
+def _value_node(value: str) -> ast.expr:
+    """Builds a Constant node for a literal value string, or a Name node for anything else."""
+    if value in _QUICK_LITERALS:
+        literal = _QUICK_LITERALS[value]
+        # Give each node its own empty list/dict rather than sharing one.
+        return ast.Constant(value=type(literal)() if isinstance(literal, (list, dict)) else literal)
+    if _INT_LITERAL.fullmatch(value):
+        return ast.Constant(value=int(value))
+    if _SIMPLE_STRING_LITERAL.fullmatch(value):
+        return ast.Constant(value=value[1:-1])
+    try:
+        return ast.Constant(value=ast.literal_eval(value))
+    except (ValueError, SyntaxError):
+        return ast.Name(id=value, ctx=ast.Load())
+
+
+def _find_named_def(parsed: ParsedSource, name: str, node_types: Tuple[type, ...] = _FUNCTION_TYPES) -> Optional[ast.AST]:
+    """
+    Finds a definition by name, checking the top-level symbol index first and
+    then the bodies of top-level classes, instead of walking every node in the tree.
+    """
+    tree = parsed.tree
+    index = parsed.find(name, node_types)
+    if index is not None:
+        return tree.body[index]
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, node_types) and child.name == name:
+                    return child
+    return None
+
+
+@serialize_by_path
 async def add_parameter_to_function(path: str, function_name: str, parameter_name: str, vector_context_service: VectorContextService, code_intelligence_service: CodeIntelligenceService, parameter_type: Optional[str] = None, default_value: Optional[str] = None) -> str:
     """
     Adds a new parameter to a function's signature using AST.
@@ -25,8 +71,9 @@ async def add_parameter_to_function(path: str, function_name: str, parameter_nam
 
     try:
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
-        func_node = next((node for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == function_name), None)
+        parsed = await run_in_ast_pool(take_tree, content)
+        tree = parsed.tree
+        func_node = _find_named_def(parsed, function_name)
 
         if not func_node:
             return f"Error: Function '{function_name}' not found in '{path}'."
@@ -36,11 +83,10 @@ async def add_parameter_to_function(path: str, function_name: str, parameter_nam
         if any(arg.arg == parameter_name for arg in func_node.args.args) or any(arg.arg == parameter_name for arg in func_node.args.kwonlyargs):
             return f"Error: Parameter '{parameter_name}' already exists in function '{function_name}'."
 
+        span = node_span(content, func_node)
+
         if default_value is not None:
-            try:
-                value_node = ast.Constant(value=ast.literal_eval(default_value))
-            except (ValueError, SyntaxError):
-                value_node = ast.Name(id=default_value, ctx=ast.Load())
+            value_node = _value_node(default_value)
             func_node.args.kwonlyargs.append(new_arg)
             func_node.args.kw_defaults.append(value_node)
         else:
@@ -48,8 +94,12 @@ async def add_parameter_to_function(path: str, function_name: str, parameter_nam
             func_node.args.args.insert(first_default_idx, new_arg)
 
         ast.fix_missing_locations(tree)
-        new_code = ast.unparse(tree)
-        path_obj.write_text(new_code, encoding='utf-8')
+        new_code = await run_in_ast_pool(splice_node, content, span, func_node, tree)
+        if new_code == content:
+            return f"No changes required in '{path}'."
+        # Release the parsed tree and original source before the write/reindex awaits.
+        del parsed, tree, content
+        await write_source(path_obj, new_code)
         await vector_context_service.reindex_file(path_obj, new_code)
         await code_intelligence_service.update_index_for_file(path_obj, new_code)
 
@@ -61,6 +111,7 @@ async def add_parameter_to_function(path: str, function_name: str, parameter_nam
         return f"An unexpected error occurred while adding parameter: {e}"
 
 
+@serialize_by_path
 async def add_attribute_to_init(path: str, class_name: str, attribute_name: str, default_value: str, vector_context_service: VectorContextService, code_intelligence_service: CodeIntelligenceService) -> str:
     """
     Adds a 'self.attribute = value' line to the __init__ of a class.
@@ -71,13 +122,17 @@ async def add_attribute_to_init(path: str, class_name: str, attribute_name: str,
         return f"Error: File not found at '{path}'."
     try:
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
-        class_node = next((node for node in ast.walk(tree) if isinstance(node, ast.ClassDef) and node.name == class_name), None)
+        parsed = await run_in_ast_pool(take_tree, content)
+        tree = parsed.tree
+        class_node = _find_named_def(parsed, class_name, (ast.ClassDef,))
 
         if not class_node:
             return f"Error: Class '{class_name}' not found in '{path}'."
 
         init_method = next((node for node in class_node.body if isinstance(node, ast.FunctionDef) and node.name == '__init__'), None)
+        # Only the __init__ needs re-rendering, unless we have to create it.
+        edited_node = init_method or class_node
+        span = node_span(content, edited_node)
 
         if not init_method:
             logger.info(f"__init__ not found in '{class_name}'. Creating a new one.")
@@ -86,10 +141,7 @@ async def add_attribute_to_init(path: str, class_name: str, attribute_name: str,
             class_node.body.insert(0, init_method)
 
         target = ast.Attribute(value=ast.Name(id='self', ctx=ast.Load()), attr=attribute_name, ctx=ast.Store())
-        try:
-            value_node = ast.Constant(value=ast.literal_eval(default_value))
-        except (ValueError, SyntaxError):
-            value_node = ast.Name(id=default_value, ctx=ast.Load())
+        value_node = _value_node(default_value)
         assignment = ast.Assign(targets=[target], value=value_node)
 
         if len(init_method.body) == 1 and (isinstance(init_method.body[0], ast.Pass) or (isinstance(init_method.body[0], ast.Expr) and isinstance(init_method.body[0].value, ast.Constant) and init_method.body[0].value.value is Ellipsis)):
@@ -97,8 +149,11 @@ async def add_attribute_to_init(path: str, class_name: str, attribute_name: str,
 
         init_method.body.append(assignment)
         ast.fix_missing_locations(tree)
-        new_code = ast.unparse(tree)
-        path_obj.write_text(new_code, encoding='utf-8')
+        new_code = await run_in_ast_pool(splice_node, content, span, edited_node, tree)
+        if new_code == content:
+            return f"No changes required in '{path}'."
+        del parsed, tree, content
+        await write_source(path_obj, new_code)
         await vector_context_service.reindex_file(path_obj, new_code)
         await code_intelligence_service.update_index_for_file(path_obj, new_code)
 
@@ -109,6 +164,7 @@ async def add_attribute_to_init(path: str, class_name: str, attribute_name: str,
         return f"An unexpected error occurred while adding attribute: {e}"
 
 
+@serialize_by_path
 async def add_decorator_to_function(path: str, function_name: str, decorator_code: str, vector_context_service: VectorContextService, code_intelligence_service: CodeIntelligenceService) -> str:
     """
     Adds a decorator to a specific function or method in a Python file.
@@ -127,16 +183,27 @@ async def add_decorator_to_function(path: str, function_name: str, decorator_cod
         return f"Error: File not found at '{path}'."
     try:
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
-        target_function = next((node for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == function_name), None)
+        parsed = await run_in_ast_pool(take_tree, content)
+        tree = parsed.tree
+        target_function = _find_named_def(parsed, function_name)
 
         if not target_function:
             return f"Error: Function or method '{function_name}' not found in '{path}'."
 
+        span = node_span(content, target_function)
         target_function.decorator_list.insert(0, decorator_node)
         ast.fix_missing_locations(tree)
-        new_code = ast.unparse(tree)
-        path_obj.write_text(new_code, encoding='utf-8')
+        indent = line_indent(content, span[0]) if span else None
+        if indent is not None and not indent.strip():
+            # Insert just the decorator line above the existing definition.
+            start = span[0]
+            new_code = f"{content[:start]}@{fast_unparse(decorator_node)}\n{indent}{content[start:]}"
+        else:
+            new_code = fast_unparse(tree)
+        if new_code == content:
+            return f"No changes required in '{path}'."
+        del parsed, tree, content
+        await write_source(path_obj, new_code)
         await vector_context_service.reindex_file(path_obj, new_code)
         await code_intelligence_service.update_index_for_file(path_obj, new_code)
 
@@ -147,33 +214,11 @@ async def add_decorator_to_function(path: str, function_name: str, decorator_cod
         return f"An unexpected error occurred while adding decorator: {e}"
 
 
-class RenameTransformer(ast.NodeTransformer):
-    def __init__(self, old_name, new_name):
-        self.old_name = old_name
-        self.new_name = new_name
-    def visit_Name(self, node):
-        if node.id == self.old_name: node.id = self.new_name
-        return node
-    def visit_FunctionDef(self, node):
-        if node.name == self.old_name: node.name = self.new_name
-        self.generic_visit(node)
-        return node
-    def visit_AsyncFunctionDef(self, node):
-        if node.name == self.old_name: node.name = self.new_name
-        self.generic_visit(node)
-        return node
-    def visit_ClassDef(self, node):
-        if node.name == self.old_name: node.name = self.new_name
-        self.generic_visit(node)
-        return node
-    def visit_arg(self, node):
-        if node.arg == self.old_name: node.arg = self.new_name
-        return node
-
-
+@serialize_by_path
 async def rename_symbol_in_file(path: str, old_name: str, new_name: str, vector_context_service: VectorContextService, code_intelligence_service: CodeIntelligenceService) -> str:
     """
-    Safely renames a symbol within a single Python file using an AST transformer.
+    Safely renames a symbol within a single Python file. Only the renamed
+    identifiers are rewritten; the rest of the file is left as it was.
     """
     logger.info(f"Attempting to rename '{old_name}' to '{new_name}' in file '{path}'")
     path_obj = Path(path)
@@ -181,11 +226,19 @@ async def rename_symbol_in_file(path: str, old_name: str, new_name: str, vector_
         return f"Error: File not found at '{path}'."
     try:
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
-        new_tree = RenameTransformer(old_name, new_name).visit(tree)
-        ast.fix_missing_locations(new_tree)
-        new_code = ast.unparse(new_tree)
-        path_obj.write_text(new_code, encoding='utf-8')
+        if old_name not in content:
+            return f"Symbol '{old_name}' not found in '{path}'; nothing to rename."
+        new_code = await run_in_ast_pool(rename_in_source, content, old_name, new_name)
+        if new_code is None:
+            parsed = await run_in_ast_pool(take_tree, content)
+            new_tree = RenameTransformer(old_name, new_name).visit(parsed.tree)
+            ast.fix_missing_locations(new_tree)
+            new_code = await run_in_ast_pool(fast_unparse, new_tree)
+            del parsed, new_tree
+        if new_code == content:
+            return f"No changes required in '{path}'."
+        del content
+        await write_source(path_obj, new_code)
         await vector_context_service.reindex_file(path_obj, new_code)
         await code_intelligence_service.update_index_for_file(path_obj, new_code)
 
@@ -196,6 +249,7 @@ async def rename_symbol_in_file(path: str, old_name: str, new_name: str, vector_
         return f"An unexpected error occurred during symbol renaming: {e}"
 
 
+@serialize_by_path
 async def append_to_function(path: str, function_name: str, code_to_append: str, vector_context_service: VectorContextService, code_intelligence_service: CodeIntelligenceService) -> str:
     """
     Appends code to the body of a specific function in a Python file.
@@ -206,13 +260,17 @@ async def append_to_function(path: str, function_name: str, code_to_append: str,
         return f"Error: File not found at '{path}'."
     try:
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
+        parsed = await run_in_ast_pool(take_tree, content)
+        tree = parsed.tree
         append_nodes = ast.parse(code_to_append).body
-        target_function = next((node for node in ast.walk(tree) if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == function_name), None)
+        target_function = _find_named_def(parsed, function_name)
 
         if not target_function:
             return f"Error: Function '{function_name}' not found in '{path}'."
+        if not append_nodes:
+            return f"No changes required in '{path}'."
 
+        span = node_span(content, target_function)
         insert_index = len(target_function.body)
         for i, body_node in enumerate(target_function.body):
             if isinstance(body_node, ast.Return):
@@ -226,8 +284,11 @@ async def append_to_function(path: str, function_name: str, code_to_append: str,
         for i, new_node in enumerate(append_nodes):
             target_function.body.insert(insert_index + i, new_node)
 
-        new_code = ast.unparse(tree)
-        path_obj.write_text(new_code, encoding='utf-8')
+        new_code = await run_in_ast_pool(splice_node, content, span, target_function, tree)
+        if new_code == content:
+            return f"No changes required in '{path}'."
+        del parsed, tree, content
+        await write_source(path_obj, new_code)
         await vector_context_service.reindex_file(path_obj, new_code)
         await code_intelligence_service.update_index_for_file(path_obj, new_code)
 
@@ -238,6 +299,7 @@ async def append_to_function(path: str, function_name: str, code_to_append: str,
         return f"An unexpected error occurred while appending to function: {e}"
 
 
+@serialize_by_path
 async def replace_node_in_file(path: str, node_name: str, new_code: str, vector_context_service: VectorContextService, code_intelligence_service: CodeIntelligenceService) -> str:
     """
     Replaces a top-level function or class node in a file with new code.
@@ -248,7 +310,8 @@ async def replace_node_in_file(path: str, node_name: str, new_code: str, vector_
         return f"Error: File not found at '{path}'."
     try:
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
+        parsed = await run_in_ast_pool(take_tree, content)
+        tree = parsed.tree
         new_code_tree = ast.parse(new_code)
 
         if not new_code_tree.body or not isinstance(new_code_tree.body[0], (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
@@ -258,18 +321,18 @@ async def replace_node_in_file(path: str, node_name: str, new_code: str, vector_
         if new_node.name != node_name:
             return f"Error: Node name in `new_code` ('{new_node.name}') does not match `node_name` ('{node_name}')."
 
-        node_replaced = False
-        for i, existing_node in enumerate(tree.body):
-            if isinstance(existing_node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and existing_node.name == node_name:
-                tree.body[i] = new_node
-                node_replaced = True
-                break
-
-        if not node_replaced:
+        node_index = parsed.find(node_name)
+        if node_index is None:
             return f"Error: Node '{node_name}' not found in '{path}'."
 
-        new_content = ast.unparse(tree)
-        path_obj.write_text(new_content, encoding='utf-8')
+        span = node_span(content, tree.body[node_index])
+        tree.body[node_index] = new_node
+
+        new_content = await run_in_ast_pool(splice_node, content, span, new_node, tree)
+        if new_content == content:
+            return f"No changes required in '{path}'."
+        del parsed, tree, content
+        await write_source(path_obj, new_content)
         await vector_context_service.reindex_file(path_obj, new_content)
         await code_intelligence_service.update_index_for_file(path_obj, new_content)
 
@@ -280,6 +343,7 @@ async def replace_node_in_file(path: str, node_name: str, new_code: str, vector_
         return f"An unexpected error occurred while replacing node: {e}"
 
 
+@serialize_by_path
 async def replace_method_in_class(path: str, class_name: str, method_name: str, new_code: str, vector_context_service: VectorContextService, code_intelligence_service: CodeIntelligenceService) -> str:
     """
     Replaces a specific method within a class in a file with new code.
@@ -290,7 +354,8 @@ async def replace_method_in_class(path: str, class_name: str, method_name: str,
         return f"Error: File not found at '{path}'."
     try:
         content = path_obj.read_text(encoding='utf-8')
-        tree = ast.parse(content)
+        parsed = await run_in_ast_pool(take_tree, content)
+        tree = parsed.tree
         new_code_tree = ast.parse(new_code)
 
         if not new_code_tree.body or not isinstance(new_code_tree.body[0], (ast.FunctionDef, ast.AsyncFunctionDef)):
@@ -300,13 +365,14 @@ async def replace_method_in_class(path: str, class_name: str, method_name: str,
         if new_method_node.name != method_name:
             return f"Error: Name in `new_code` ('{new_method_node.name}') doesn't match `method_name` ('{method_name}')."
 
-        class_node = next((node for node in ast.walk(tree) if isinstance(node, ast.ClassDef) and node.name == class_name), None)
+        class_node = _find_named_def(parsed, class_name, (ast.ClassDef,))
         if not class_node:
             return f"Error: Class '{class_name}' not found in '{path}'."
 
         method_replaced = False
         for i, class_body_node in enumerate(class_node.body):
             if isinstance(class_body_node, (ast.FunctionDef, ast.AsyncFunctionDef)) and class_body_node.name == method_name:
+                span = node_span(content, class_body_node)
                 class_node.body[i] = new_method_node
                 method_replaced = True
                 break
@@ -314,8 +380,11 @@ async def replace_method_in_class(path: str, class_name: str, method_name: str,
         if not method_replaced:
             return f"Error: Method '{method_name}' not found in class '{class_name}'."
 
-        new_content = ast.unparse(tree)
-        path_obj.write_text(new_content, encoding='utf-8')
+        new_content = await run_in_ast_pool(splice_node, content, span, new_method_node, tree)
+        if new_content == content:
+            return f"No changes required in '{path}'."
+        del parsed, tree, content
+        await write_source(path_obj, new_content)
         await vector_context_service.reindex_file(path_obj, new_content)
         await code_intelligence_service.update_index_for_file(path_obj, new_content)
 
@@ -1,12 +1,18 @@
 # src/foundry/actions/code_intelligence_actions.py
 import logging
-import ast
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, repeat
+from pathlib import Path
+from typing import List, Optional, Tuple
+from src.foundry.ast_utils import get_process_pool, rename_in_file
 from src.services.code_intelligence_service import CodeIntelligenceService
 from src.core.managers import ProjectManager
 
 logger = logging.getLogger(__name__)
 
+# Below this many files, shipping them to worker processes costs more than renaming in-process.
+PARALLEL_RENAME_MIN_FILES = 16
+
 
 def find_definition(code_intelligence_service: CodeIntelligenceService, symbol_name: str) -> str:
     """
@@ -72,41 +78,12 @@ def get_dependencies(code_intelligence_service: CodeIntelligenceService, symbol_
     return "\n".join(response_parts)
 
 
-class RenameTransformer(ast.NodeTransformer):
-    """
-    An AST NodeTransformer to safely rename variables, functions, and classes.
-    """
-    def __init__(self, old_name, new_name):
-        self.old_name = old_name
-        self.new_name = new_name
-
-    def visit_Name(self, node):
-        if node.id == self.old_name:
-            node.id = self.new_name
-        return node
-
-    def visit_FunctionDef(self, node):
-        if node.name == self.old_name:
-            node.name = self.new_name
-        self.generic_visit(node)
-        return node
-
-    def visit_AsyncFunctionDef(self, node):
-        if node.name == self.old_name:
-            node.name = self.new_name
-        self.generic_visit(node)
-        return node
-
-    def visit_ClassDef(self, node):
-        if node.name == self.old_name:
-            node.name = self.new_name
-        self.generic_visit(node)
-        return node
-
-    def visit_arg(self, node):
-        if node.arg == self.old_name:
-            node.arg = self.new_name
-        return node
+def _read_source(full_path: Path) -> Tuple[Optional[str], Optional[str]]:
+    """Reads a file for rename_symbol; returns (content, error message or None)."""
+    try:
+        return full_path.read_text(encoding='utf-8'), None
+    except Exception as e:
+        return None, str(e)
 
 
 def rename_symbol(project_manager: ProjectManager, code_intelligence_service: CodeIntelligenceService, old_name: str,
@@ -121,25 +98,45 @@ def rename_symbol(project_manager: ProjectManager, code_intelligence_service: Co
     if not definitions:
         return f"Error: Cannot rename. Symbol '{old_name}' not found in the project index."
 
+    if not project_manager.active_project_path:
+        return "Error: No active project to perform rename in."
+
     references = code_intelligence_service.find_references(old_name)
 
     # Combine all files that need modification (where the symbol is defined or referenced)
-    files_to_modify = {s.file_path for s in definitions + references}
-
-    for rel_path_str in files_to_modify:
-        if not project_manager.active_project_path:
-            return "Error: No active project to perform rename in."
-        full_path = project_manager.active_project_path / rel_path_str
-        try:
-            content = full_path.read_text(encoding='utf-8')
-            tree = ast.parse(content)
-            transformer = RenameTransformer(old_name, new_name)
-            new_tree = transformer.visit(tree)
-            ast.fix_missing_locations(new_tree)
-            new_content = ast.unparse(new_tree)
-            full_path.write_text(new_content, encoding='utf-8')
+    files_to_modify = sorted({s.file_path for s in chain(definitions, references)})
+    full_paths = [project_manager.active_project_path / rel_path_str for rel_path_str in files_to_modify]
+
+    # Reads are I/O-bound, so fetch every file concurrently before the CPU-bound pass.
+    with ThreadPoolExecutor(max_workers=min(16, len(full_paths))) as pool:
+        reads = list(pool.map(_read_source, full_paths))
+
+    errors = []
+    candidates = []
+    for rel_path_str, full_path, (content, error) in zip(files_to_modify, full_paths, reads):
+        if error is not None:
+            errors.append(f"Failed to rename in file {rel_path_str}: {error}")
+        elif old_name in content:
+            candidates.append((rel_path_str, full_path, content))
+    del reads
+
+    # Each file is independent, so large renames fan out across processes.
+    rename_args = ([full_path for _, full_path, _ in candidates], [content for _, _, content in candidates],
+                   repeat(old_name), repeat(new_name))
+    if len(candidates) >= PARALLEL_RENAME_MIN_FILES:
+        results = list(get_process_pool().map(rename_in_file, *rename_args))
+    else:
+        results = list(map(rename_in_file, *rename_args))
+
+    renamed_count = 0
+    for (rel_path_str, _, _), (renamed, error) in zip(candidates, results):
+        if error is not None:
+            errors.append(f"Failed to rename in file {rel_path_str}: {error}")
+        elif renamed:
+            renamed_count += 1
             logger.info(f"Successfully applied rename in {rel_path_str}")
-        except Exception as e:
-            return f"Failed to rename in file {rel_path_str}: {e}"
 
-    return f"Successfully renamed '{old_name}' to '{new_name}' across {len(files_to_modify)} files."
\ No newline at end of file
+    if errors:
+        return f"Renamed '{old_name}' to '{new_name}' in {renamed_count} files, but {len(errors)} failed:\n" + "\n".join(errors)
+
+    return f"Successfully renamed '{old_name}' to '{new_name}' across {renamed_count} files."
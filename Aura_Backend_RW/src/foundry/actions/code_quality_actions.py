@@ -2,7 +2,9 @@
 """
 Contains actions related to code quality, such as linting.
 """
+import functools
 import logging
+import threading
 import pycodestyle
 import io
 from contextlib import redirect_stdout
@@ -11,6 +13,15 @@ from src.core.managers import ProjectContext
 
 logger = logging.getLogger(__name__)
 
+# The cached StyleGuide holds the current report, so only one lint runs at a time.
+_style_guide_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _style_guide(quiet: bool = False) -> pycodestyle.StyleGuide:
+    """Builds a StyleGuide once; construction reads config files and sets up every checker."""
+    return pycodestyle.StyleGuide(quiet=quiet)
+
 
 def lint_file(path: str) -> str:
     """
@@ -18,9 +29,11 @@ def lint_file(path: str) -> str:
     """
     logger.info(f"Linting file: {path}")
     try:
-        style_guide = pycodestyle.StyleGuide(quiet=False)
+        style_guide = _style_guide(False)
         string_io = io.StringIO()
-        with redirect_stdout(string_io):
+        with _style_guide_lock, redirect_stdout(string_io):
+            # Error counts accumulate on a report, so start each lint with a fresh one.
+            style_guide.init_report()
             result = style_guide.check_files([path])
         output = string_io.getvalue()
 
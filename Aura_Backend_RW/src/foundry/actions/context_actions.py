@@ -2,19 +2,50 @@
 """
 Contains actions related to managing and indexing project context.
 """
+import asyncio
+import json
 import logging
-import ast
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+from src.foundry.ast_utils import atomic_write_text, extract_definition_chunks, get_process_pool
 from src.services.vector_context_service import VectorContextService
 from src.core.managers.project_context import ProjectContext
 
 logger = logging.getLogger(__name__)
 
+# Below this many files, shipping them to worker processes costs more than parsing in-process.
+PARALLEL_INDEX_MIN_FILES = 64
 
-def index_project_context(project_context: ProjectContext, vector_context_service: VectorContextService, path: str = ".") -> str:
+# Chunks sent to the vector store per add_documents call.
+BATCH_SIZE = 100
+
+# {relative path: [st_mtime_ns, st_size]} of every file as of its last indexing.
+# Kept inside the vector store's directory so that wiping the store resets it too.
+INDEX_META_PATH = Path(".rag_db") / "index_meta.json"
+
+
+def _load_meta(project_root: Path) -> Dict[str, List[int]]:
+    try:
+        with open(project_root / INDEX_META_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_meta(project_root: Path, meta: Dict[str, List[int]]) -> None:
+    meta_path = project_root / INDEX_META_PATH
+    meta_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(meta_path, json.dumps(meta))
+
+
+async def index_project_context(project_context: ProjectContext, vector_context_service: VectorContextService, path: str = ".") -> str:
     """
     Scans a directory for Python files, extracts functions and classes,
     and adds them to the vector database. This action is now sandboxed
-    to the active project directory.
+    to the active project directory. Files whose modification time and size
+    are unchanged since they were last indexed are skipped.
 
     Args:
         project_context: Injected by the ToolRunner. Contains the active project's root path.
@@ -50,34 +81,88 @@ def index_project_context(project_context: ProjectContext, vector_context_servic
     # Exclude common virtual environment and metadata folders
     exclude_dirs = {'venv', '.venv', '__pycache__', 'node_modules', '.git', 'chroma_db'}
 
-    py_files = [p for p in scan_path.rglob("*.py") if not any(excluded in p.parts for excluded in exclude_dirs)]
+    # os.walk lets us prune excluded directories so their subtrees are never visited.
+    py_files = []
+    for dirpath, dirnames, filenames in os.walk(scan_path):
+        dirnames[:] = [d for d in dirnames if d not in exclude_dirs]
+        py_files.extend(Path(dirpath) / f for f in filenames if f.endswith('.py'))
 
+    meta = _load_meta(project_root)
+    changed_files = []
+    seen_paths = set()
     for file_path in py_files:
-        logger.debug(f"Processing file: {file_path}")
+        rel_path = str(file_path.relative_to(project_root))
+        seen_paths.add(rel_path)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            tree = ast.parse(content)
-
-            for node in tree.body:
-                if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
-                    source_code = ast.unparse(node)
-                    node_type = "function" if isinstance(node, ast.FunctionDef) else "class"
-
-                    documents.append(source_code)
-                    metadatas.append({
-                        "file_path": str(file_path.relative_to(project_root)),
-                        "node_type": node_type,
-                        "node_name": node.name,
-                    })
-        except Exception as e:
-            logger.warning(f"Could not parse or read file {file_path}: {e}")
+            stat = file_path.stat()
+        except OSError as e:
+            logger.warning(f"Could not stat file {file_path}: {e}")
             continue
-
-    if not documents:
+        signature = [stat.st_mtime_ns, stat.st_size]
+        if meta.get(rel_path) != signature:
+            changed_files.append((file_path, rel_path, signature))
+
+    # Files under the scanned path that have disappeared since the last run
+    # must have their chunks removed, or stale symbols keep being retrieved.
+    scan_parts = scan_path.relative_to(project_root).parts
+    deleted_paths = [
+        rel_path for rel_path in meta
+        if rel_path not in seen_paths and Path(rel_path).parts[:len(scan_parts)] == scan_parts
+    ]
+    for rel_path in deleted_paths:
+        await vector_context_service.delete_documents_for_file(rel_path)
+        del meta[rel_path]
+    if deleted_paths:
+        _save_meta(project_root, meta)
+
+    if not changed_files:
+        return f"Index is up to date. None of the {len(py_files)} Python files changed since they were last indexed."
+
+    # Symbols removed from a changed file must not linger in the index.
+    for _, rel_path, _ in changed_files:
+        if rel_path in meta:
+            await vector_context_service.delete_documents_for_file(rel_path)
+
+    # Chunks are embedded in batches as files finish parsing, so memory stays
+    # bounded by the batch size and embedding overlaps with the remaining parses.
+    loop = asyncio.get_running_loop()
+    executor = get_process_pool() if len(changed_files) >= PARALLEL_INDEX_MIN_FILES else None
+    indexed_count = 0
+    extracted_paths = set()
+    futures = [loop.run_in_executor(executor, extract_definition_chunks, file_path, project_root) for file_path, _, _ in changed_files]
+    try:
+        indexed_at = int(time.time())
+        for (_, rel_path, signature), future in zip(changed_files, futures):
+            result = await future
+            if result is None:
+                # Leave the file unrecorded so the next run retries it.
+                meta.pop(rel_path, None)
+                continue
+            file_documents, file_metadatas = result
+            extracted_paths.add(rel_path)
+            for file_meta in file_metadatas:
+                file_meta["indexed_at"] = indexed_at
+                file_meta["version"] = signature[0]
+            documents.extend(file_documents)
+            metadatas.extend(file_metadatas)
+            if len(documents) >= BATCH_SIZE:
+                await vector_context_service.add_documents(documents, metadatas)
+                indexed_count += len(documents)
+                documents, metadatas = [], []
+        if documents:
+            await vector_context_service.add_documents(documents, metadatas)
+            indexed_count += len(documents)
+    finally:
+        # The pool is shared, so only this run's queued work is cancelled.
+        for future in futures:
+            future.cancel()
+
+    for _, rel_path, signature in changed_files:
+        if rel_path in extracted_paths:
+            meta[rel_path] = signature
+    _save_meta(project_root, meta)
+
+    if not indexed_count:
         return "No new functions or classes found to index in the specified path."
 
-    vector_context_service.add_documents(documents, metadatas)
-
-    return f"Successfully indexed {len(documents)} new code chunks (functions/classes) from {len(py_files)} Python files."
\ No newline at end of file
+    return f"Successfully indexed {indexed_count} new code chunks (functions/classes) from {len(changed_files)} changed Python files ({len(py_files) - len(changed_files)} unchanged files skipped)."
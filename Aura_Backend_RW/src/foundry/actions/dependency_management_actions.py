@@ -1,10 +1,19 @@
 # foundry/actions/dependency_management_actions.py
 import logging
+import re
 from pathlib import Path
 from typing import List
 
 logger = logging.getLogger(__name__)
 
+# Anything that can follow the package name in a requirement specifier.
+_SEP = re.compile(r'[=<>!~;\[\s]')
+
+
+def _norm(requirement: str) -> str:
+    """Returns the lower-cased package name of a requirement line."""
+    return _SEP.split(requirement.strip(), 1)[0].lower()
+
 
 def add_dependency_to_requirements(path: str = "requirements.txt", dependencies: List[str] = None) -> str:
     """
@@ -19,25 +28,31 @@ def add_dependency_to_requirements(path: str = "requirements.txt", dependencies:
     existing_deps = []
 
     try:
-        req_file.parent.mkdir(parents=True, exist_ok=True)
-        if not req_file.exists():
-            req_file.touch()
+        try:
+            f = req_file.open('a+', encoding='utf-8')
+        except FileNotFoundError:
+            req_file.parent.mkdir(parents=True, exist_ok=True)
+            f = req_file.open('a+', encoding='utf-8')
 
-        with open(req_file, 'r+', encoding='utf-8') as f:
+        with f:
+            f.seek(0)
             lines = f.readlines()
-            existing_packages = {line.split('==')[0].split('>')[0].split('<')[0].strip().lower() for line in lines}
+            existing_packages = {_norm(line) for line in lines if line.strip() and not line.lstrip().startswith('#')}
 
             for dep in dependencies:
-                package_name = dep.split('==')[0].split('>')[0].split('<')[0].strip().lower()
+                package_name = _norm(dep)
                 if package_name not in existing_packages:
-                    if lines and not lines[-1].endswith('\n'):
-                        f.write('\n')
-                    f.write(f"{dep}\n")
                     added_deps.append(dep)
                     existing_packages.add(package_name) # Add to set to handle duplicates in the input list
                 else:
                     existing_deps.append(dep)
 
+            if added_deps:
+                # Append mode always writes at the end of the file.
+                if lines and not lines[-1].endswith('\n'):
+                    f.write('\n')
+                f.writelines(f"{dep}\n" for dep in added_deps)
+
         message_parts = []
         if added_deps:
             message_parts.append(f"Successfully added: {', '.join(added_deps)}.")
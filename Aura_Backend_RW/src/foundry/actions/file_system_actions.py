@@ -5,15 +5,19 @@ All functions in this module assume that any relative paths have been
 resolved to absolute paths by the ExecutorService before being passed in.
 """
 import logging
-import asyncio
+import os
 import shutil
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
+from src.core.managers import ProjectContext
 from src.services import DevelopmentTeamService, VectorContextService
 
 logger = logging.getLogger(__name__)
 
+# Files generated per coder call by write_files.
+WRITE_FILES_BATCH_SIZE = 8
+
 
 async def write_file(
     path: str,
@@ -54,14 +58,28 @@ async def write_file(
     if final_content is None:
         return "Error: No content was provided or generated to write to the file."
 
+    return _write_text_file(path, final_content, vector_context_service)
+
+
+def _write_text_file(path: str, final_content: str, vector_context_service: Optional[VectorContextService]) -> str:
     try:
         path_obj = Path(path)
+        # Regenerated files are often byte-identical; skip the write and the re-embedding.
+        try:
+            unchanged = path_obj.read_text(encoding='utf-8') == final_content
+        except (OSError, UnicodeDecodeError):
+            unchanged = False
+        if unchanged:
+            logger.info(f"Content of '{path}' is unchanged; skipping write and re-index.")
+            return f"No changes required in '{path}'."
+
         path_obj.parent.mkdir(parents=True, exist_ok=True)
         bytes_written = path_obj.write_text(final_content, encoding='utf-8')
 
         if vector_context_service and path_obj.suffix == '.py':
-            await vector_context_service.reindex_file(path_obj, final_content)
-            logger.info(f"Synchronously re-indexed '{path}' for RAG context.")
+            # Embedding runs in the background so the agent's next tool call isn't held up.
+            vector_context_service.schedule_reindex_file(path_obj, final_content)
+            logger.info(f"Scheduled re-index of '{path}' for RAG context.")
 
         success_message = f"Successfully wrote {bytes_written} bytes to {path}"
         logger.info(success_message)
@@ -72,7 +90,61 @@ async def write_file(
         return error_message
 
 
-def append_to_file(path: str, content: str, vector_context_service: VectorContextService) -> str:
+async def write_files(
+    files: List[Dict[str, Any]],
+    project_context: ProjectContext,
+    development_team_service: DevelopmentTeamService = None,
+    vector_context_service: VectorContextService = None,
+    user_id: Optional[str] = None,
+    current_task_id: Optional[int] = None,
+    user_idea: Optional[str] = None
+) -> str:
+    """
+    Writes several files in one call. Each entry has a `path` and either
+    `content` or a `task_description`; files to be generated are sent to the
+    AI coder together, up to WRITE_FILES_BATCH_SIZE per call, so they should
+    not depend on each other's contents.
+    """
+    if not project_context or not project_context.project_root:
+        return "Error: Cannot write files. No active project context."
+    if not files:
+        return "Error: No files provided."
+    for entry in files:
+        if not isinstance(entry, dict) or not entry.get("path"):
+            return "Error: Every entry in `files` must be an object with a `path`."
+        if entry.get("content") is None and not entry.get("task_description"):
+            return f"Error: '{entry['path']}' needs either `content` or a `task_description`."
+
+    contents = {entry["path"]: entry["content"] for entry in files if entry.get("content") is not None}
+    to_generate = [{"path": entry["path"], "task_description": entry["task_description"]}
+                   for entry in files if entry.get("content") is None]
+    if to_generate:
+        if not development_team_service:
+            return "Error: `task_description` was provided, but the DevelopmentTeamService is not available to the tool."
+        if not all([user_id, current_task_id is not None, user_idea]):
+            return "Error: write_files requires user_id, current_task_id, and user_idea for code generation."
+        for start in range(0, len(to_generate), WRITE_FILES_BATCH_SIZE):
+            generated = await development_team_service.generate_code_for_tasks(
+                user_id=user_id,
+                files=to_generate[start:start + WRITE_FILES_BATCH_SIZE],
+                user_idea=user_idea,
+                current_task_id=current_task_id
+            )
+            if isinstance(generated, str):
+                return generated  # Propagate the error from the generation service
+            contents.update(generated)
+
+    results = []
+    for entry in files:
+        full_path = project_context.project_root / entry["path"]
+        result = _write_text_file(str(full_path), contents[entry["path"]], vector_context_service)
+        if result.startswith("An unexpected error"):
+            return "Error: " + "\n".join(results + [result])
+        results.append(result)
+    return f"Successfully wrote {len(files)} files.\n" + "\n".join(results)
+
+
+async def append_to_file(path: str, content: str, vector_context_service: VectorContextService) -> str:
     """
     Appends content to a file and re-indexes it for RAG if it's a Python file.
     """
@@ -82,14 +154,15 @@ def append_to_file(path: str, content: str, vector_context_service: VectorContex
         if not path_obj.is_file():
             return f"Error: File not found at path '{path}'. Cannot append."
 
+        existing = path_obj.read_text(encoding='utf-8')
+        separator = '\n' if existing and not existing.endswith('\n') else ''
         with path_obj.open('a', encoding='utf-8') as f:
-            if path_obj.read_text(encoding='utf-8') and not path_obj.read_text(encoding='utf-8').endswith('\n'):
-                f.write('\n')
+            f.write(separator)
             bytes_written = f.write(content)
 
         if vector_context_service and path_obj.suffix == '.py':
-            full_content = path_obj.read_text(encoding='utf-8')
-            asyncio.run(vector_context_service.reindex_file(path_obj, full_content))
+            full_content = existing + separator + content
+            await vector_context_service.reindex_file(path_obj, full_content)
             logger.info(f"Synchronously re-indexed '{path}' after append for RAG context.")
 
         success_message = f"Successfully appended {bytes_written} bytes to {path}"
@@ -130,7 +203,10 @@ def list_files(path: str = ".") -> str:
             return f"Error: Directory not found at path '{path}'"
         if not path_obj.is_dir():
             return f"Error: Path '{path}' is a file, not a directory."
-        entries = [f"{entry.name}/" if entry.is_dir() else entry.name for entry in sorted(path_obj.iterdir())]
+        # DirEntry.is_dir() answers from the directory listing itself on most
+        # filesystems, so this avoids a stat() call per entry.
+        with os.scandir(path_obj) as it:
+            entries = [entry.name + '/' if entry.is_dir() else entry.name for entry in sorted(it, key=lambda e: e.name)]
         if not entries:
             return f"Directory '{path}' is empty."
         result = f"Contents of '{path}':\n" + "\n".join(entries)
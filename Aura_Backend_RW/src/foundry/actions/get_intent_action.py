@@ -1,10 +1,14 @@
 # foundry/actions/get_intent_action.py
 import logging
 from pathlib import Path
+from typing import Dict, Tuple
 from src.core.managers import ProjectContext
 
 logger = logging.getLogger(__name__)
 
+# {intent.md path: (st_mtime_ns, st_size, content)}; a stat is enough to revalidate.
+_intent_cache: Dict[Path, Tuple[int, int, str]] = {}
+
 
 def get_intent(project_context: ProjectContext) -> str:
     """
@@ -16,10 +20,18 @@ def get_intent(project_context: ProjectContext) -> str:
     try:
         intent_path = project_context.project_root / 'intent.md'
         logger.info(f"Attempting to read intent file from: {intent_path}")
-        if intent_path.exists():
-            return intent_path.read_text(encoding='utf-8')
-        else:
+        try:
+            st = intent_path.stat()
+        except FileNotFoundError:
+            _intent_cache.pop(intent_path, None)
             return "The 'intent.md' file was not found in the project root."
+
+        cached = _intent_cache.get(intent_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        content = intent_path.read_text(encoding='utf-8')
+        _intent_cache[intent_path] = (st.st_mtime_ns, st.st_size, content)
+        return content
     except Exception as e:
         logger.error(f"An error occurred while reading the intent file: {e}", exc_info=True)
         return f"An error occurred while reading the intent file: {e}"
\ No newline at end of file
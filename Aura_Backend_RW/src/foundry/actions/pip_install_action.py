@@ -1,51 +1,173 @@
 # foundry/actions/pip_install_action.py
+import hashlib
+import json
 import logging
+import re
 import subprocess
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 from src.core.managers import ProjectContext
+from src.foundry.process_utils import run_streaming
 
 logger = logging.getLogger(__name__)
 
+# Written inside the venv: {requirements key: sha256 of the files last installed successfully}.
+INSTALL_STAMP_NAME = ".aura_installed_requirements.json"
+# --no-input: there is no TTY to answer prompts, so fail instead of hanging.
+# --disable-pip-version-check: skips pip's startup query to PyPI for a newer pip.
+PIP_COMMON_ARGS = ["--no-input", "--disable-pip-version-check"]
+# -r/-c lines that pull another file into a requirements file ("-r base.txt", "--constraint=c.txt").
+INCLUDE_LINE_RE = re.compile(r'^\s*(?:-r|-c|--requirement|--constraint)[\s=]*(\S+)', re.MULTILINE)
 
-def pip_install(project_context: ProjectContext, requirements_path: str = "requirements.txt") -> str:
+
+def _pip_command_base(project_context: ProjectContext) -> Optional[List[str]]:
+    """Returns the command prefix that runs pip in the project's venv, or None if there is no venv."""
+    # Determine pip command, preferring direct executable but falling back to module invocation.
+    # The context only carries venv paths that existed when it was taken.
+    if project_context.venv_pip_str:
+        return [project_context.venv_pip_str]
+    if project_context.venv_python_str:
+        logger.warning("Could not find pip executable, attempting to run via 'python -m pip'")
+        return [project_context.venv_python_str, "-m", "pip"]
+    return None
+
+
+def _stamp_path(pip_command_base: List[str]) -> Path:
+    # Both bin/pip and bin/python (Scripts/ on Windows) sit one level below the venv root.
+    return Path(pip_command_base[0]).parent.parent / INSTALL_STAMP_NAME
+
+
+def _load_stamps(pip_command_base: List[str]) -> Dict[str, str]:
+    try:
+        with open(_stamp_path(pip_command_base), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _requirements_stamp(req_files: List[Path]) -> Optional[Tuple[str, str]]:
     """
-    Installs dependencies from a requirements file using the project's virtual environment.
+    Returns (key, digest) identifying the exact contents of `req_files` and of
+    every file they include through -r/-c lines. Returns None, so the install
+    always runs, when an included file cannot be read (e.g. it is a URL).
     """
-    if not project_context or not project_context.project_root:
-        return "Error: Cannot run pip install. No active project context."
+    digest = hashlib.sha256()
+    seen = set()
 
-    # Determine pip command, preferring direct executable but falling back to module invocation
-    if project_context.venv_pip_path and project_context.venv_pip_path.exists():
-        pip_command_base = [str(project_context.venv_pip_path)]
-    elif project_context.venv_python_path and project_context.venv_python_path.exists():
-        logger.warning("Could not find pip executable, attempting to run via 'python -m pip'")
-        pip_command_base = [str(project_context.venv_python_path), "-m", "pip"]
-    else:
-        return "Error: No virtual environment Python or pip executable found. Cannot install dependencies."
+    def add(req_file: Path) -> bool:
+        resolved = req_file.resolve()
+        if resolved in seen:
+            return True
+        seen.add(resolved)
+        try:
+            data = resolved.read_bytes()
+        except OSError:
+            return False
+        digest.update(data)
+        digest.update(b"\0")
+        for match in INCLUDE_LINE_RE.finditer(data.decode('utf-8', errors='replace')):
+            target = match.group(1)
+            if '://' in target or '$' in target:
+                return False
+            # pip resolves relative includes against the including file's directory.
+            if not add(resolved.parent / target):
+                return False
+        return True
 
-    working_dir = project_context.project_root
-    req_file = Path(requirements_path)
+    if not all(add(req_file) for req_file in req_files):
+        return None
+    return "|".join(str(req_file.resolve()) for req_file in req_files), digest.hexdigest()
 
-    if not req_file.exists():
-        return f"Error: requirements file not found at '{req_file}'. Please create it first."
 
-    install_command = pip_command_base + ["install", "-r", str(req_file)]
+def _run_pip(pip_command_base: List[str], pip_args: List[str], working_dir: Path, check: bool = True) -> subprocess.CompletedProcess:
+    command = pip_command_base + pip_args
+    logger.info(f"Executing command: '{' '.join(command)}' in '{working_dir}'")
+    # Verbose resolver output is kept bounded rather than captured whole.
+    returncode, stdout, stderr = run_streaming(command, cwd=str(working_dir))
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stdout, stderr)
+    return subprocess.CompletedProcess(command, returncode, stdout, stderr)
+
 
-    logger.info(f"Executing command: '{' '.join(install_command)}' in '{working_dir}'")
+def _run_pip_install(project_context: ProjectContext, pip_command_base: List[str], install_args: List[str], source_desc: str,
+                     stamp: Optional[Tuple[str, str]] = None) -> str:
+    """
+    Runs pip install. With a `stamp`, the install is skipped when the venv last
+    installed exactly these requirements successfully, and recorded otherwise.
+    """
+    stamps = _load_stamps(pip_command_base) if stamp else {}
+    if stamp and stamps.get(stamp[0]) == stamp[1]:
+        logger.info(f"Requirements in {source_desc} are unchanged since the last install; skipping pip.")
+        return f"Successfully verified dependencies from {source_desc}: already installed and unchanged since the last install."
+
+    working_dir = project_context.project_root
     try:
-        result = subprocess.run(
-            install_command,
-            check=True,
-            capture_output=True,
-            text=True,
-            cwd=str(working_dir),
-            shell=False
-        )
-        return f"Successfully installed dependencies from {requirements_path}.\n---STDOUT---\n{result.stdout}"
+        # pip's own HTTP and wheel caches already make repeat installs cheap.
+        result = _run_pip(pip_command_base, ["install", *PIP_COMMON_ARGS, *install_args], working_dir)
+        if stamp:
+            stamps[stamp[0]] = stamp[1]
+            try:
+                _stamp_path(pip_command_base).write_text(json.dumps(stamps), encoding='utf-8')
+            except OSError as e:
+                logger.warning(f"Could not record installed requirements: {e}")
+        return f"Successfully installed dependencies from {source_desc}.\n---STDOUT---\n{result.stdout}"
     except subprocess.CalledProcessError as e:
         return f"Error installing dependencies.\nReturn Code: {e.returncode}\n---STDERR---\n{e.stderr}"
     except FileNotFoundError:
         return f"Error: Command '{pip_command_base[0]}' not found. The virtual environment might be corrupted."
     except Exception as e:
-        return f"An unexpected error occurred during pip install: {e}"
\ No newline at end of file
+        return f"An unexpected error occurred during pip install: {e}"
+
+
+def pip_install(project_context: ProjectContext, requirements_path: str = "requirements.txt", packages: Optional[List[str]] = None) -> str:
+    """
+    Installs dependencies using the project's virtual environment. If `packages`
+    is given, all of them are installed by a single pip process; otherwise the
+    requirements file is installed.
+    """
+    if not project_context or not project_context.project_root:
+        return "Error: Cannot run pip install. No active project context."
+
+    pip_command_base = _pip_command_base(project_context)
+    if pip_command_base is None:
+        return "Error: No virtual environment Python or pip executable found. Cannot install dependencies."
+
+    if packages:
+        # One pip process resolves and installs the whole set, rather than one per package.
+        return _run_pip_install(project_context, pip_command_base, list(packages), ", ".join(packages))
+
+    req_file = Path(requirements_path)
+    if not req_file.exists():
+        return f"Error: requirements file not found at '{req_file}'. Please create it first."
+    return _run_pip_install(project_context, pip_command_base, ["-r", str(req_file)], requirements_path,
+                            stamp=_requirements_stamp([req_file]))
+
+
+def pip_install_many(project_context: ProjectContext, requirement_files: List[str]) -> str:
+    """
+    Installs several requirements files (e.g. prod, dev and test) into the
+    project's virtual environment with a single pip run.
+    """
+    if not project_context or not project_context.project_root:
+        return "Error: Cannot run pip install. No active project context."
+    if not requirement_files:
+        return "Error: No requirements files provided."
+
+    pip_command_base = _pip_command_base(project_context)
+    if pip_command_base is None:
+        return "Error: No virtual environment Python or pip executable found. Cannot install dependencies."
+
+    # Relative paths are relative to the project root (an absolute path is kept as is).
+    req_files = [project_context.project_root / path for path in requirement_files]
+    missing = [path for path, req_file in zip(requirement_files, req_files) if not req_file.exists()]
+    if missing:
+        return f"Error: requirements file(s) not found: {', '.join(missing)}. Please create them first."
+
+    # Concurrent pip processes writing to the same site-packages race each other,
+    # so every file is passed to one pip, which resolves them together.
+    install_args = []
+    for req_file in req_files:
+        install_args += ["-r", str(req_file)]
+    return _run_pip_install(project_context, pip_command_base, install_args, ", ".join(requirement_files),
+                            stamp=_requirements_stamp(req_files))
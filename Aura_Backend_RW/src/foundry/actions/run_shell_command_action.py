@@ -1,13 +1,38 @@
 # foundry/actions/run_shell_command_action.py
 import logging
-import subprocess
 import shlex
 import os
+from functools import lru_cache
+from typing import List, Tuple
 from src.core.managers import ProjectContext
+from src.foundry.process_utils import run_streaming
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=512)
+def _split_command(command: str, posix: bool) -> Tuple[str, ...]:
+    # Without quotes or escapes shlex would only split on whitespace, so skip its tokenizer.
+    if not any(c in command for c in '"\'\\'):
+        return tuple(command.split())
+    return tuple(shlex.split(command, posix=posix))
+
+
+def _use_venv_executable(project_context: ProjectContext, command_parts: List[str]) -> None:
+    """Rewrites a leading 'python' or 'pip' in place to the venv executable, if there is one."""
+    executable_name = command_parts[0].lower()
+
+    # Be very specific to avoid accidentally matching other scripts.
+    if (executable_name == 'python' or executable_name == 'python.exe') and project_context.venv_python_str:
+        original_executable = command_parts[0]
+        command_parts[0] = project_context.venv_python_str
+        logger.info(f"Intercepted '{original_executable}'. Using venv executable: {command_parts[0]}")
+    elif (executable_name == 'pip' or executable_name == 'pip.exe') and project_context.venv_pip_str:
+        original_executable = command_parts[0]
+        command_parts[0] = project_context.venv_pip_str
+        logger.info(f"Intercepted '{original_executable}'. Using venv executable: {command_parts[0]}")
+
+
 def run_shell_command(project_context: ProjectContext, command: str) -> str:
     """
     Executes a shell command within the project's context, intelligently using
@@ -20,46 +45,27 @@ def run_shell_command(project_context: ProjectContext, command: str) -> str:
     logger.info(f"Executing shell command: '{command}' in directory '{working_dir}'")
 
     try:
-        command_parts = shlex.split(command, posix=os.name != 'nt')
+        command_parts = list(_split_command(command, os.name != 'nt'))
         if not command_parts:
             return "Error: Empty command provided."
 
         # --- Venv-Aware Execution Logic ---
         # Intercept python and pip calls to use the venv executables if they exist.
-        executable_name = command_parts[0].lower()
-
-        # Be very specific to avoid accidentally matching other scripts.
-        if (executable_name == 'python' or executable_name == 'python.exe') and project_context.venv_python_path:
-            original_executable = command_parts[0]
-            command_parts[0] = str(project_context.venv_python_path)
-            logger.info(f"Intercepted '{original_executable}'. Using venv executable: {command_parts[0]}")
-        elif (executable_name == 'pip' or executable_name == 'pip.exe') and project_context.venv_pip_path:
-            original_executable = command_parts[0]
-            command_parts[0] = str(project_context.venv_pip_path)
-            logger.info(f"Intercepted '{original_executable}'. Using venv executable: {command_parts[0]}")
-
-        result = subprocess.run(
-            command_parts,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding='utf-8',
-            cwd=working_dir,
-            shell=False
-        )
-        output = f"Command executed successfully.\n--- STDOUT ---\n{result.stdout}\n--- STDERR ---\n{result.stderr}"
+        _use_venv_executable(project_context, command_parts)
+
+        returncode, stdout, stderr = run_streaming(command_parts, cwd=working_dir)
+        if returncode != 0:
+            error_output = (
+                f"Error executing command: '{command}'\n"
+                f"Return Code: {returncode}\n"
+                f"--- STDOUT ---\n{stdout}\n"
+                f"--- STDERR ---\n{stderr}"
+            )
+            logger.error(error_output)
+            return error_output
+        output = f"Command executed successfully.\n--- STDOUT ---\n{stdout}\n--- STDERR ---\n{stderr}"
         logger.info(f"Command '{command}' succeeded.")
         return output
-    except subprocess.CalledProcessError as e:
-        error_output = (
-            f"Error executing command: '{command}'\n"
-            f"Return Code: {e.returncode}\n"
-            f"--- STDOUT ---\n{e.stdout}\n"
-            f"--- STDERR ---\n{e.stderr}"
-        )
-        logger.error(error_output)
-        return error_output
     except FileNotFoundError:
         error_output = f"An unexpected error occurred: Command not found '{command_parts[0]}'. Make sure it's a valid command and in the system's PATH."
         logger.exception(error_output)
@@ -67,4 +73,64 @@ def run_shell_command(project_context: ProjectContext, command: str) -> str:
     except Exception as e:
         error_output = f"An unexpected error occurred while trying to run command '{command}': {e}"
         logger.exception(error_output)
-        return error_output
\ No newline at end of file
+        return error_output
+
+
+def run_pipeline(project_context: ProjectContext, steps: List[List[str]]) -> str:
+    """
+    Runs several commands (e.g. install requirements, then run the tests) in
+    order from the project root, stopping at the first one that fails. Each
+    step is an argument list; the venv's executables directory is put first on
+    PATH so tools installed by an earlier step resolve to the venv.
+    """
+    if not project_context:
+        return "Error: Cannot run pipeline. No active project context."
+    if not steps:
+        return "Error: No pipeline steps provided."
+    # Checked up front so a malformed later step never runs after earlier ones succeeded.
+    for index, step in enumerate(steps, start=1):
+        if not isinstance(step, list):
+            return f"Error: Pipeline step {index} must be a list of arguments, e.g. [\"pytest\", \"-q\"], not {type(step).__name__}."
+        if not step:
+            return f"Error: Pipeline step {index} is empty."
+
+    working_dir = str(project_context.project_root)
+    env = None
+    if project_context.venv_python_path:
+        env = os.environ.copy()
+        env["PATH"] = str(project_context.venv_python_path.parent) + os.pathsep + env.get("PATH", "")
+        env["VIRTUAL_ENV"] = str(project_context.venv_python_path.parent.parent)
+
+    reports = []
+    for index, step in enumerate(steps, start=1):
+        command_parts = [str(part) for part in step]
+        step_desc = " ".join(command_parts)
+        _use_venv_executable(project_context, command_parts)
+        logger.info(f"Pipeline step {index}/{len(steps)}: '{step_desc}' in directory '{working_dir}'")
+        try:
+            returncode, stdout, stderr = run_streaming(command_parts, cwd=working_dir, env=env)
+        except FileNotFoundError:
+            error_output = f"Error: Pipeline step {index} failed. Command not found '{command_parts[0]}'."
+            logger.error(error_output)
+            return "\n\n".join(reports + [error_output])
+        except Exception as e:
+            error_output = f"An unexpected error occurred in pipeline step {index} '{step_desc}': {e}"
+            logger.exception(error_output)
+            return "\n\n".join(reports + [error_output])
+
+        if returncode != 0:
+            error_output = (
+                f"Error: Pipeline step {index} failed: '{step_desc}'\n"
+                f"Return Code: {returncode}\n"
+                f"--- STDOUT ---\n{stdout}\n"
+                f"--- STDERR ---\n{stderr}"
+            )
+            logger.error(error_output)
+            skipped = len(steps) - index
+            if skipped:
+                error_output += f"\n\n{skipped} remaining step(s) were not run."
+            return "\n\n".join(reports + [error_output])
+        reports.append(f"Step {index} succeeded: '{step_desc}'\n--- STDOUT ---\n{stdout}\n--- STDERR ---\n{stderr}")
+
+    logger.info(f"Pipeline of {len(steps)} step(s) succeeded.")
+    return f"Successfully ran all {len(steps)} pipeline step(s).\n\n" + "\n\n".join(reports)
@@ -1,12 +1,20 @@
 # src/foundry/actions/run_tests_action.py
 import logging
-import subprocess
+from pathlib import Path
 from src.core.managers import ProjectContext
+from src.foundry.process_utils import run_streaming
 
 logger = logging.getLogger(__name__)
 
 
-def run_tests(project_context: ProjectContext) -> str:
+def _xdist_installed(venv_python_path: Path) -> bool:
+    # bin/python (Scripts/python.exe on Windows) sits one level below the venv root.
+    venv_root = venv_python_path.parent.parent
+    patterns = ("lib/python*/site-packages/xdist", "Lib/site-packages/xdist")
+    return any(any(venv_root.glob(pattern)) for pattern in patterns)
+
+
+def run_tests(project_context: ProjectContext, fast_fail: bool = True, parallel: bool = True) -> str:
     """
     Executes the project's test suite using pytest within the project's
     virtual environment.
@@ -14,6 +22,9 @@ def run_tests(project_context: ProjectContext) -> str:
     Args:
         project_context: The context of the active project, providing the
                          path to the venv Python executable.
+        fast_fail: Stop at the first failing test (-x).
+        parallel: Shard tests across all cores (-n auto) when pytest-xdist
+                  is installed in the venv; ignored otherwise.
 
     Returns:
         A string summarizing the test results or detailing the failure.
@@ -21,29 +32,30 @@ def run_tests(project_context: ProjectContext) -> str:
     if not project_context or not project_context.project_root:
         return "Error: Cannot run tests. No active project context."
 
-    if not project_context.venv_python_path or not project_context.venv_python_path.exists():
+    if not project_context.venv_python_str:
         return "Error: The project's virtual environment is not set up. Cannot find the Python executable to run pytest."
 
     working_dir = str(project_context.project_root)
     # Use the venv's python to run pytest as a module. This is the most reliable way.
+    # Pytest's default capture stays on so only failing tests report their output;
+    # the cache provider would only write .pytest_cache.
     command = [
-        str(project_context.venv_python_path),
+        project_context.venv_python_str,
         "-m",
-        "pytest"
+        "pytest",
+        "-q",
+        "-p", "no:cacheprovider",
     ]
+    if fast_fail:
+        command.append("-x")
+    if parallel and _xdist_installed(project_context.venv_python_path):
+        command += ["-n", "auto"]
 
-    # This is the corrected line.
     command_str = " ".join(command)
     logger.info(f"Executing test command: '{command_str}' in '{working_dir}'")
     try:
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            cwd=working_dir,
-            shell=False  # Security best practice
-        )
+        # Output is streamed to the log as pytest runs; only its tail is kept for the report.
+        returncode, stdout, stderr = run_streaming(command, cwd=working_dir)
 
         # Pytest exit codes:
         # 0: All tests passed
@@ -53,20 +65,20 @@ def run_tests(project_context: ProjectContext) -> str:
         # 4: Pytest command line usage error
         # 5: No tests were collected
 
-        if result.returncode == 0:
-            success_message = f"All tests passed successfully!\n\n--- PYTEST OUTPUT ---\n{result.stdout}"
+        if returncode == 0:
+            success_message = f"All tests passed successfully!\n\n--- PYTEST OUTPUT ---\n{stdout}"
             logger.info(success_message)
             return success_message
-        elif result.returncode == 5:
-            no_tests_message = f"Pytest ran, but no tests were found to execute.\n\n--- PYTEST OUTPUT ---\n{result.stdout}"
+        elif returncode == 5:
+            no_tests_message = f"Pytest ran, but no tests were found to execute.\n\n--- PYTEST OUTPUT ---\n{stdout}"
             logger.warning(no_tests_message)
             return no_tests_message
         else:
             # Any other non-zero exit code is a failure.
             failure_message = (
                 f"Error: One or more tests failed.\n\n"
-                f"--- PYTEST STDOUT ---\n{result.stdout}\n\n"
-                f"--- PYTEST STDERR ---\n{result.stderr}"
+                f"--- PYTEST STDOUT ---\n{stdout}\n\n"
+                f"--- PYTEST STDERR ---\n{stderr}"
             )
             logger.error(failure_message)
             return failure_message
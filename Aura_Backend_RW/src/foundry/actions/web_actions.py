@@ -2,18 +2,72 @@
 """
 Contains actions related to interacting with web services and APIs.
 """
+import asyncio
 import logging
-import requests
+import aiohttp
 import json
 from typing import Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-def api_request(method: str, url: str, headers: Optional[Dict[str, Any]] = None,
-                json_body: Optional[Dict[str, Any]] = None) -> str:
+# One pooled session for every call, so repeated requests to the same host reuse
+# its TCP/TLS connection instead of handshaking each time. Cookies are not kept,
+# so calls stay independent of one another. aiohttp sessions belong to the loop
+# they were created on, so it is created lazily (and again if the loop changes).
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        if _session is not None and not _session.closed:
+            _discard_session(_session, _session_loop)
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(limit=100, limit_per_host=20),
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+        _session_loop = loop
+    return _session
+
+
+def _discard_session(session: aiohttp.ClientSession, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    # close() has to run on the loop that owns the session's connections.
+    if loop is not None and loop.is_running():
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+    else:
+        # Its loop is gone and its connections with it; just mark the session closed.
+        session.detach()
+
+
+async def close_session() -> None:
+    """Closes the shared session. Called on application shutdown."""
+    global _session, _session_loop
+    session, _session, _session_loop = _session, None, None
+    if session is not None and not session.closed:
+        await session.close()
+
+
+def _pretty_json(text: str) -> str:
+    """Re-indents a JSON document; raises json.JSONDecodeError if `text` is not JSON."""
+    if ORJSON_AVAILABLE:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError.
+        return orjson.dumps(orjson.loads(text), option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(json.loads(text), indent=2)
+
+
+async def api_request(method: str, url: str, headers: Optional[Dict[str, Any]] = None,
+                      json_body: Optional[Dict[str, Any]] = None) -> str:
     """
-    Performs a generic API request using the requests library.
+    Performs a generic API request on a shared, connection-pooled aiohttp session.
 
     Args:
         method: The HTTP method (GET, POST, etc.).
@@ -26,42 +80,40 @@ def api_request(method: str, url: str, headers: Optional[Dict[str, Any]] = None,
     """
     logger.info(f"Performing API request: {method} {url}")
     try:
-        response = requests.request(
+        async with _get_session().request(
             method=method.upper(),
             url=url,
             headers=headers,
             json=json_body,
-            timeout=30  # Add a reasonable timeout
-        )
+        ) as response:
+            response_text = await response.text()
 
-        # Raise an exception for bad status codes (4xx or 5xx)
-        response.raise_for_status()
+        # Report bad status codes (4xx or 5xx) as failures
+        if response.status >= 400:
+            error_message = (
+                f"API Request Failed with HTTP Error: {response.status} {response.reason}\n"
+                f"Response: {response_text}"
+            )
+            logger.warning(error_message)
+            return error_message
 
         # Try to parse response as JSON, fall back to text if it fails
         try:
-            response_data = response.json()
-            response_content = json.dumps(response_data, indent=2)
+            response_content = _pretty_json(response_text)
         except json.JSONDecodeError:
-            response_content = response.text
+            response_content = response_text
 
         success_message = (
-            f"API Request Successful: {response.status_code} {response.reason}\n"
+            f"API Request Successful: {response.status} {response.reason}\n"
             f"Response:\n{response_content}"
         )
         return success_message
 
-    except requests.exceptions.HTTPError as e:
-        error_message = (
-            f"API Request Failed with HTTP Error: {e.response.status_code} {e.response.reason}\n"
-            f"Response: {e.response.text}"
-        )
-        logger.warning(error_message)
-        return error_message
-    except requests.exceptions.RequestException as e:
-        error_message = f"API Request Failed with a network error: {e}"
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        error_message = f"API Request Failed with a network error: {e!r}"
         logger.error(error_message, exc_info=True)
         return error_message
     except Exception as e:
         error_message = f"An unexpected error occurred during the API request: {e}"
         logger.exception(error_message)
-        return error_message
\ No newline at end of file
+        return error_message
@@ -0,0 +1,515 @@
+# src/foundry/ast_utils.py
+"""
+Shared helpers for the AST-based actions that edit Python source files.
+
+Instead of regenerating a whole file with `ast.unparse(tree)` (which drops
+comments and reformats everything), these helpers locate the original text of
+the node being changed and splice only that region, leaving the rest of the
+file byte-for-byte intact.
+"""
+import ast
+import asyncio
+import functools
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import re
+import stat
+import sys
+import tempfile
+import threading
+import tokenize
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Span = Tuple[int, int]
+
+DEF_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+# f-strings are tokenized piecewise from Python 3.12 on; None (never matched) before that.
+_FSTRING_START = getattr(tokenize, 'FSTRING_START', None)
+_FSTRING_END = getattr(tokenize, 'FSTRING_END', None)
+
+# The text between a definition's col_offset and its name.
+_DEF_KEYWORD = re.compile(r'(?:async\s+)?(?:def|class)\s+')
+
+def fast_unparse(node: ast.AST) -> str:
+    """Unparses `node`; the one place the AST actions regenerate source from a tree."""
+    return ast.unparse(node)
+
+
+@dataclass
+class ParsedSource:
+    """A parsed module plus indexes of its top-level definitions and imports."""
+    tree: ast.Module
+    # {name: index in tree.body} of the first top-level def/class with that name.
+    symbol_index: Dict[str, int] = field(default_factory=dict)
+    # Modules imported with a top-level `import X`.
+    imports_direct: Set[str] = field(default_factory=set)
+    # {module: names} imported with a top-level `from module import ...`.
+    imports_from: Dict[str, Set[str]] = field(default_factory=dict)
+
+    @classmethod
+    def parse(cls, content: str) -> "ParsedSource":
+        parsed = cls(tree=ast.parse(content))
+        for i, node in enumerate(parsed.tree.body):
+            if isinstance(node, DEF_TYPES):
+                parsed.symbol_index.setdefault(node.name, i)
+            elif isinstance(node, ast.Import):
+                parsed.imports_direct.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                parsed.imports_from.setdefault(node.module, set()).update(alias.name for alias in node.names)
+        return parsed
+
+    def find(self, name: str, node_types: Tuple[type, ...] = DEF_TYPES) -> Optional[int]:
+        """Returns the tree.body index of the first top-level definition `name` that has one of `node_types`."""
+        i = self.symbol_index.get(name)
+        if i is None:
+            return None
+        body = self.tree.body
+        if isinstance(body[i], node_types):
+            return i
+        # A different kind of definition took the name first; look past it.
+        return next((j for j in range(i + 1, len(body))
+                     if isinstance(body[j], node_types) and body[j].name == name), None)
+
+
+class RenameTransformer(ast.NodeTransformer):
+    """
+    Renames every definition, parameter and name reference matching `old_name`
+    in a single pass over the tree.
+    """
+    # Maps each renameable node type to the attribute holding its identifier.
+    _NAME_FIELDS = {
+        ast.Name: 'id',
+        ast.FunctionDef: 'name',
+        ast.AsyncFunctionDef: 'name',
+        ast.ClassDef: 'name',
+        ast.arg: 'arg',
+    }
+
+    def __init__(self, old_name, new_name):
+        # Identifiers produced by ast.parse are interned, so an interned
+        # old_name lets us match with an identity check instead of ==.
+        self.old_name = sys.intern(old_name)
+        self.new_name = new_name
+
+    def generic_visit(self, node):
+        node_type = type(node)
+        field = self._NAME_FIELDS.get(node_type)
+        if field is not None and getattr(node, field) is self.old_name:
+            setattr(node, field, self.new_name)
+        if node_type is ast.Name:
+            # A Name's only child is its ctx marker; there is nothing below it to rename.
+            return node
+        return super().generic_visit(node)
+
+
+# Parsed modules keyed by a hash of their source, so chained actions on the
+# same file (and the reindexing that follows each write) share one parse.
+_TREE_CACHE_SIZE = 32
+_tree_cache: "OrderedDict[bytes, ParsedSource]" = OrderedDict()
+_tree_cache_lock = threading.Lock()
+
+
+# Parsing and unparsing large modules is CPU-bound; running it here keeps the
+# event loop free to serve other requests while an action works on a file.
+_AST_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="ast")
+_path_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+# Process pool for CPU-bound fan-out over many files (indexing, renames), started on
+# first use and kept for the life of the server. Workers come from a forkserver
+# (spawn where that is unavailable) rather than being forked from this
+# multi-threaded process, where a child could inherit a lock another thread held.
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Returns the shared worker process pool, (re)starting it if needed."""
+    global _process_pool
+    with _process_pool_lock:
+        # A pool whose worker died is unusable; replace it instead of failing every later call.
+        if _process_pool is None or getattr(_process_pool, '_broken', False):
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                mp_context=multiprocessing.get_context(method))
+        return _process_pool
+
+
+async def run_in_ast_pool(func: Callable[..., Any], *args: Any) -> Any:
+    """Runs a parse/unparse helper on the shared AST thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(_AST_POOL, func, *args)
+
+
+def serialize_by_path(action: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Decorator for async actions that edit the file at their `path` argument.
+    Calls for the same file run one at a time; calls for different files can
+    interleave freely.
+    """
+    @functools.wraps(action)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        path = kwargs['path'] if 'path' in kwargs else args[0]
+        key = os.path.abspath(path)
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = asyncio.Lock()
+        async with lock:
+            return await action(*args, **kwargs)
+    return wrapper
+
+
+def _content_key(content: str) -> bytes:
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+
+def load_tree(content: str) -> ParsedSource:
+    """
+    Returns the cached parse of `content`, parsing it on a miss. The returned
+    tree is shared and must not be mutated; use `take_tree` for that.
+    """
+    key = _content_key(content)
+    with _tree_cache_lock:
+        parsed = _tree_cache.get(key)
+        if parsed is not None:
+            _tree_cache.move_to_end(key)
+            return parsed
+    parsed = ParsedSource.parse(content)
+    with _tree_cache_lock:
+        _tree_cache[key] = parsed
+        if len(_tree_cache) > _TREE_CACHE_SIZE:
+            _tree_cache.popitem(last=False)
+    return parsed
+
+
+def take_tree(content: str) -> ParsedSource:
+    """
+    Returns a fresh parse of `content` that the caller owns and may mutate.
+    The cache is bypassed: a cached tree may still be walked by other readers
+    (e.g. a background reindex), so it must never be handed out for mutation.
+    """
+    return ParsedSource.parse(content)
+
+
+def _line_starts(content: str) -> List[int]:
+    """Returns the character offset at which each line of `content` starts."""
+    starts = [0]
+    pos = content.find('\n')
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = content.find('\n', pos + 1)
+    return starts
+
+
+def _char_offset(content: str, starts: List[int], lineno: int, byte_col: int) -> int:
+    """Converts an AST (lineno, UTF-8 byte column) position to a character offset."""
+    line_start = starts[lineno - 1]
+    if content.isascii():
+        return line_start + byte_col
+    line_end = starts[lineno] if lineno < len(starts) else len(content)
+    line = content[line_start:line_end]
+    return line_start + len(line.encode('utf-8')[:byte_col].decode('utf-8', errors='replace'))
+
+
+def line_indent(content: str, offset: int) -> str:
+    """Returns the text between the start of the line containing `offset` and `offset`."""
+    return content[content.rfind('\n', 0, offset) + 1:offset]
+
+
+def node_span(content: str, node: ast.AST, starts: Optional[List[int]] = None) -> Optional[Span]:
+    """
+    Returns the (start, end) character offsets of a statement node within the
+    source it was parsed from, including any decorators. Returns None when the
+    node carries no position information. Pass `starts` (from `_line_starts`)
+    when computing spans for many nodes of the same source.
+    """
+    if getattr(node, 'lineno', None) is None or getattr(node, 'end_lineno', None) is None:
+        return None
+    lineno = node.lineno
+    decorators = getattr(node, 'decorator_list', None)
+    if decorators:
+        # The '@' of each decorator sits in the same column as the definition.
+        lineno = min(lineno, min(d.lineno for d in decorators))
+    if starts is None:
+        starts = _line_starts(content)
+    start = _char_offset(content, starts, lineno, node.col_offset)
+    end = _char_offset(content, starts, node.end_lineno, node.end_col_offset)
+    return start, end
+
+
+def iter_definition_sources(content: str, tree: ast.Module) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yields (node_type, qualified name, source) for every function and class in
+    `tree`, including methods and nested definitions. The source is sliced from
+    `content` and dedented, so comments survive and nothing is unparsed.
+    Repeated qualified names (e.g. property setters) get a `#n` suffix so each
+    definition stays distinguishable.
+    """
+    starts = _line_starts(content)
+    seen: Dict[str, int] = {}
+
+    def visit(parent: ast.AST, prefix: str) -> Iterator[Tuple[str, str, str]]:
+        for node in ast.iter_child_nodes(parent):
+            if not isinstance(node, DEF_TYPES):
+                yield from visit(node, prefix)
+                continue
+            qualname = prefix + node.name
+            count = seen[qualname] = seen.get(qualname, 0) + 1
+            span = node_span(content, node, starts)
+            if span is None:
+                source = fast_unparse(node)
+            else:
+                source = content[span[0]:span[1]]
+                indent = line_indent(content, span[0])
+                if indent:
+                    # Strip the definition's own indent; lines inside multi-line strings that
+                    # sit further left are left untouched.
+                    source = "\n".join(line[len(indent):] if line.startswith(indent) else line for line in source.split("\n"))
+            node_type = "class" if isinstance(node, ast.ClassDef) else "function"
+            yield node_type, qualname if count == 1 else f"{qualname}#{count}", source
+            yield from visit(node, qualname + '.')
+
+    return visit(tree, '')
+
+
+def extract_definition_chunks(file_path: Path, project_root: Path) -> Optional[Tuple[List[str], List[Dict[str, Any]]]]:
+    """
+    Parses one Python file and returns the source and metadata of its functions,
+    classes and methods. Runs in worker processes, so it lives here rather than
+    beside the indexing action (whose module pulls in the vector store) and never
+    raises: a bad file yields None instead of aborting the batch.
+    """
+    documents: List[str] = []
+    metadatas: List[Dict[str, Any]] = []
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        tree = ast.parse(content)
+        rel_path = str(file_path.relative_to(project_root))
+
+        for node_type, node_name, source_code in iter_definition_sources(content, tree):
+            documents.append(source_code)
+            metadatas.append({
+                "file_path": rel_path,
+                "node_type": node_type,
+                "node_name": node_name,
+            })
+    except Exception as e:
+        logger.warning(f"Could not parse or read file {file_path}: {e}")
+        return None
+    return documents, metadatas
+
+
+def _string_continuation_rows(code: str) -> Set[int]:
+    """
+    Returns the 1-based numbers of the lines of `code` that begin inside a
+    string literal (the continuation lines of a multi-line string or f-string).
+    Raises tokenize.TokenError or SyntaxError if `code` cannot be tokenized.
+    """
+    rows: Set[int] = set()
+    fstring_starts: List[int] = []
+    for token in tokenize.generate_tokens(io.StringIO(code).readline):
+        if token.type == _FSTRING_START:
+            fstring_starts.append(token.start[0])
+            continue
+        if token.type == _FSTRING_END:
+            first_row = fstring_starts.pop()
+        elif token.type == tokenize.STRING:
+            first_row = token.start[0]
+        else:
+            continue
+        if not fstring_starts:
+            rows.update(range(first_row + 1, token.end[0] + 1))
+    return rows
+
+
+def splice_source(content: str, span: Span, code: str) -> Optional[str]:
+    """
+    Replaces the text covered by `span` with `code`, re-indenting `code` to the
+    column the span starts at. Lines inside multi-line string literals are left
+    as they are, since indenting them would change the string's value. Returns
+    None if the span does not start a line or `code` cannot be tokenized.
+    """
+    start, end = span
+    indent = line_indent(content, start)
+    if indent.strip():
+        return None
+    if indent:
+        try:
+            in_string = _string_continuation_rows(code)
+        except (tokenize.TokenError, SyntaxError):
+            return None
+        code = "\n".join(
+            indent + line if line.strip() and row not in in_string else line
+            for row, line in enumerate(code.split("\n"), start=1)
+        )[len(indent):]
+    return content[:start] + code + content[end:]
+
+
+def splice_node(content: str, span: Optional[Span], node: ast.AST, tree: ast.Module) -> str:
+    """
+    Re-renders only `node` over its original `span` in `content`. Falls back to
+    unparsing the whole tree when the node's original position is unknown.
+    """
+    if span is not None:
+        new_content = splice_source(content, span, fast_unparse(node))
+        if new_content is not None:
+            return new_content
+    return fast_unparse(tree)
+
+
+def insert_top_level_source(content: str, tree: ast.Module, index: int, code: str) -> Optional[str]:
+    """
+    Inserts `code` as a new top-level statement so that it lands at `index` in
+    `tree.body` (as parsed from `content`), without touching surrounding text.
+    Returns None when the neighbouring statements carry no position information.
+    """
+    if index >= len(tree.body):
+        if content and not content.endswith('\n'):
+            content += '\n'
+        return content + code + '\n'
+
+    if index == 0:
+        span = node_span(content, tree.body[0])
+        if span is None:
+            return None
+        offset = span[0]
+    else:
+        end_lineno = getattr(tree.body[index - 1], 'end_lineno', None)
+        if end_lineno is None:
+            return None
+        starts = _line_starts(content)
+        if end_lineno >= len(starts):
+            # The previous statement ends on the last line, which has no newline after it.
+            content += '\n'
+            offset = len(content)
+        else:
+            offset = starts[end_lineno]
+    return content[:offset] + code + '\n' + content[offset:]
+
+
+def append_top_level_source(content: str, code: str) -> str:
+    """Appends a new top-level definition to the end of `content`, separated by two blank lines."""
+    if not content.strip():
+        return code + '\n'
+    return content.rstrip() + '\n\n\n' + code + '\n'
+
+
+def rename_in_source(content: str, old_name: str, new_name: str) -> Optional[str]:
+    """
+    Renames the same definitions, parameters and name references as
+    `RenameTransformer`, but by editing just those identifiers in the original
+    text, so the rest of the file keeps its comments and formatting and nothing
+    is unparsed. Returns None if an occurrence cannot be located in the text;
+    callers then fall back to the transformer.
+    """
+    tree = load_tree(content).tree
+    old_name = sys.intern(old_name)
+    starts = _line_starts(content)
+    offsets = []
+    for node in ast.walk(tree):
+        node_type = type(node)
+        if node_type is ast.Name:
+            if node.id is not old_name:
+                continue
+            offset = _char_offset(content, starts, node.lineno, node.col_offset)
+        elif node_type is ast.arg:
+            if node.arg is not old_name:
+                continue
+            offset = _char_offset(content, starts, node.lineno, node.col_offset)
+        elif node_type in DEF_TYPES:
+            if node.name is not old_name:
+                continue
+            match = _DEF_KEYWORD.match(content, _char_offset(content, starts, node.lineno, node.col_offset))
+            if match is None:
+                return None
+            offset = match.end()
+        else:
+            continue
+        if not content.startswith(old_name, offset):
+            return None
+        offsets.append(offset)
+
+    offsets.sort()
+    pieces = []
+    previous = 0
+    for offset in offsets:
+        pieces.append(content[previous:offset])
+        pieces.append(new_name)
+        previous = offset + len(old_name)
+    pieces.append(content[previous:])
+    return ''.join(pieces)
+
+
+def atomic_write_text(path_obj: Path, text: str) -> int:
+    """
+    Replaces the contents of an existing file by writing to a temporary file in
+    the same directory and swapping it in with `os.replace`, so concurrent
+    readers (including the reindexers) never see a partially written file.
+    Files that do not exist yet are written directly.
+
+    Symlinks are resolved first so the link's target is replaced rather than
+    the link itself, and the target's permission bits are carried over since
+    `mkstemp` always creates the temporary file as 0600.
+    """
+    if not path_obj.exists():
+        return path_obj.write_text(text, encoding='utf-8')
+    target = path_obj.resolve()
+    mode = stat.S_IMODE(os.stat(target).st_mode)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            written = f.write(text)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return written
+
+
+def rename_in_file(full_path: Path, content: str, old_name: str, new_name: str) -> Tuple[bool, Optional[str]]:
+    """
+    Applies a rename to one file's content and atomically writes it back. Runs
+    in worker processes, so it never raises; returns (whether the file was
+    rewritten, error message or None).
+    """
+    try:
+        new_content = rename_in_source(content, old_name, new_name)
+        if new_content is None:
+            new_tree = RenameTransformer(old_name, new_name).visit(ast.parse(content))
+            ast.fix_missing_locations(new_tree)
+            new_content = fast_unparse(new_tree)
+        if new_content == content:
+            return False, None
+        atomic_write_text(full_path, new_content)
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+async def write_source(path_obj: Path, new_code: str) -> None:
+    """
+    Atomically writes an action's result and caches a fresh parse of it, so
+    the reindexing that follows (and the next action on the file) reuses that
+    tree instead of parsing again on the event loop.
+    """
+    atomic_write_text(path_obj, new_code)
+    try:
+        await run_in_ast_pool(load_tree, new_code)
+    except SyntaxError:
+        pass
@@ -7,7 +7,7 @@ from typing import Any, Callable, Dict, Optional
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Blueprint:
     """
     Represents a self-contained, executable tool that the AVM can use.
@@ -18,13 +18,13 @@ class Blueprint:
     action_function_name: str
     template: str = ""
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BlueprintInvocation:
     """Represents a specific invocation of a tool based on a Blueprint."""
     blueprint: Blueprint
     parameters: Dict[str, Any]
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RawCodeInstruction:
     """
     Represents a direct, raw code instruction to be executed or displayed.
@@ -33,7 +33,7 @@ class RawCodeInstruction:
     language: str = "python"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class UserInputRequest:
     """A special object returned by an action to signal a pause for user input."""
     question: str
\ No newline at end of file
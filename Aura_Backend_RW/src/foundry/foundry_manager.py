@@ -1,14 +1,33 @@
 # src/foundry/foundry_manager.py
+import dataclasses
 import importlib
 import inspect
+import json
 import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from src.foundry.blueprints import Blueprint
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Blueprint data from the last scan, {"schema": BLUEPRINT_SCHEMA,
+# "records": {file name: {"mtime": st_mtime_ns, "blueprint": fields or None}}}.
+# Lets a cold start build unchanged blueprints without importing their modules.
+BLUEPRINT_MANIFEST_PATH = Path(__file__).parent.parent / "blueprints" / "__pycache__" / "blueprints_manifest.json"
+# Stored alongside the records; a manifest written for a different Blueprint shape is discarded whole.
+BLUEPRINT_SCHEMA = [f"{f.name}:{f.type}" for f in dataclasses.fields(Blueprint)]
+
 
 class FoundryManager:
     """
@@ -18,6 +37,11 @@ class FoundryManager:
     def __init__(self) -> None:
         self._blueprints: Dict[str, Blueprint] = {}
         self._actions: Dict[str, Callable[..., Any]] = {}
+        # Built on first request; reset whenever the set of blueprints changes.
+        self._tool_defs_cache: Optional[List[Dict[str, Any]]] = None
+        self._tool_defs_json_cache: Optional[str] = None
+        # {module name: st_mtime_ns of its file when it was last (re)loaded}
+        self._module_mtimes: Dict[str, int] = {}
 
         self.rescan_and_load()
 
@@ -34,15 +58,45 @@ class FoundryManager:
         # Clear existing dictionaries
         self._blueprints.clear()
         self._actions.clear()
+        self._tool_defs_cache = None
+        self._tool_defs_json_cache = None
         logger.info("Cleared existing blueprints and actions for rescan.")
 
-        # Reload everything
+        # Reload everything. Newly created tool files are only visible to the
+        # import system once its directory caches are invalidated.
+        importlib.invalidate_caches()
         self._discover_and_load_actions()
         self._discover_and_load_blueprints()
 
         logger.info(
             f"FoundryManager re-initialized with {len(self._blueprints)} blueprints and {len(self._actions)} actions.")
 
+    @staticmethod
+    def _scan_modules(directory: Path, package_name: str) -> List[Tuple[str, Path, int]]:
+        """
+        Lists the tool modules in `directory` as (module name, file path, st_mtime_ns).
+        The mtime comes from the directory scan itself, so each file is stat()ed once.
+        """
+        entries = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith(".py") and not entry.name.startswith("__") and entry.is_file():
+                    entries.append((f"{package_name}.{entry.name[:-3]}", Path(entry.path), entry.stat().st_mtime_ns))
+        return entries
+
+    def _load_module(self, module_name: str, file_path: Path, mtime: int) -> ModuleType:
+        """
+        Imports `module_name`, re-executing it only if its file changed since it
+        was last loaded, so rescans of unchanged tools cost no more than the scan.
+        """
+        module = sys.modules.get(module_name)
+        if module is None:
+            module = importlib.import_module(module_name)
+        elif self._module_mtimes.get(module_name) != mtime:
+            module = importlib.reload(module)
+        self._module_mtimes[module_name] = mtime
+        return module
+
     def _add_blueprint(self, blueprint: Blueprint) -> None:
         if blueprint.action_function_name not in self._actions:
             logger.error(
@@ -56,28 +110,107 @@ class FoundryManager:
             logger.warning("Blueprint with id '%s' is being overwritten.", blueprint.id)
 
         self._blueprints[blueprint.id] = blueprint
+        self._tool_defs_cache = None
+        self._tool_defs_json_cache = None
         logger.debug("Registered blueprint: %s", blueprint.id)
 
+    def _load_modules(self, entries: List[Tuple[str, Path, int]]) -> List[Tuple[str, Path, Optional[ModuleType], Optional[Exception]]]:
+        """
+        Loads the given (module name, file path, mtime) entries on a small thread pool so
+        their file reads overlap, and returns (name, path, module, error) for each
+        in the original order. Modules that fail are retried serially: two modules
+        importing each other from different threads can trip the import system's
+        deadlock detection even though a serial import would succeed.
+        """
+        def attempt(entry: Tuple[str, Path, int]) -> Tuple[Optional[ModuleType], Optional[Exception]]:
+            try:
+                return self._load_module(*entry), None
+            except Exception as e:
+                return None, e
+
+        if not entries:
+            return []
+        with ThreadPoolExecutor(max_workers=min(8, len(entries))) as pool:
+            results = list(pool.map(attempt, entries))
+
+        loaded = []
+        for entry, (module, error) in zip(entries, results):
+            if error is not None:
+                module, error = attempt(entry)
+            loaded.append((entry[0], entry[1], module, error))
+        return loaded
+
+    @staticmethod
+    def _read_blueprint_manifest() -> Dict[str, Any]:
+        try:
+            data = BLUEPRINT_MANIFEST_PATH.read_bytes()
+            manifest = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifest, dict) or manifest.get("schema") != BLUEPRINT_SCHEMA:
+            logger.info("Blueprint manifest was written for a different Blueprint schema; rebuilding it.")
+            return {}
+        return manifest.get("records") or {}
+
+    @staticmethod
+    def _write_blueprint_manifest(manifest: Dict[str, Any]) -> None:
+        try:
+            BLUEPRINT_MANIFEST_PATH.parent.mkdir(exist_ok=True)
+            document = {"schema": BLUEPRINT_SCHEMA, "records": manifest}
+            data = orjson.dumps(document) if ORJSON_AVAILABLE else json.dumps(document).encode('utf-8')
+            tmp_path = BLUEPRINT_MANIFEST_PATH.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, BLUEPRINT_MANIFEST_PATH)
+        except (OSError, TypeError) as e:
+            logger.warning(f"Could not write the blueprint manifest: {e}")
+
     def _discover_and_load_blueprints(self) -> None:
+        """
+        Registers every blueprint. Blueprints are plain data, so those whose file
+        is unchanged since the manifest was written are rebuilt from it; only new
+        or edited blueprint files are imported.
+        """
         try:
             blueprints_dir = Path(__file__).parent.parent / "blueprints"
             package_name = "src.blueprints"
-            for file_path in blueprints_dir.glob("*.py"):
-                if file_path.name.startswith("__"): continue
-                module_name = f"{package_name}.{file_path.stem}"
+            entries = self._scan_modules(blueprints_dir, package_name)
+            manifest = self._read_blueprint_manifest()
+            new_manifest: Dict[str, Any] = {}
+            to_import = []
+            for entry in entries:
+                record = manifest.get(entry[1].name)
+                if record is not None and record.get("mtime") == entry[2]:
+                    new_manifest[entry[1].name] = record
+                else:
+                    to_import.append(entry)
+
+            for module_name, file_path, module, error in self._load_modules(to_import):
+                if error is not None:
+                    logger.error(f"Failed to load blueprint from %s: %s", file_path.name, error, exc_info=error)
+                    continue
+                if hasattr(module, "blueprint") and isinstance(module.blueprint, Blueprint):
+                    fields = dataclasses.asdict(module.blueprint)
+                else:
+                    fields = None
+                new_manifest[file_path.name] = {"mtime": self._module_mtimes[module_name], "blueprint": fields}
+
+            # Registration touches shared dicts, so it stays on this thread.
+            for module_name, file_path, _ in entries:
+                record = new_manifest.get(file_path.name)
+                if record is None:
+                    continue
                 try:
-                    # The key to reloading is to invalidate Python's cache
-                    if module_name in inspect.sys.modules:
-                         importlib.reload(inspect.sys.modules[module_name])
-
-                    module = importlib.import_module(module_name)
-                    if hasattr(module, "blueprint") and isinstance(module.blueprint, Blueprint):
-                        self._add_blueprint(module.blueprint)
-                        logger.info("Loaded blueprint '%s' from %s.", module.blueprint.id, file_path.name)
+                    if record["blueprint"] is not None:
+                        blueprint = Blueprint(**record["blueprint"])
+                        self._add_blueprint(blueprint)
+                        logger.info("Loaded blueprint '%s' from %s.", blueprint.id, file_path.name)
                     else:
                         logger.warning("File %s does not contain a valid 'blueprint' instance.", file_path.name)
                 except Exception as e:
                     logger.error(f"Failed to load blueprint from %s: %s", file_path.name, e, exc_info=True)
+
+            if new_manifest != manifest:
+                self._write_blueprint_manifest(new_manifest)
         except Exception as e:
             logger.critical("A critical error occurred during blueprint discovery: %s", e, exc_info=True)
 
@@ -89,15 +222,16 @@ class FoundryManager:
                 logger.error(
                     f"Action discovery failed: The directory 'foundry/actions/' or its '__init__.py' file is missing.")
                 return
-            for file_path in actions_dir.glob("*.py"):
-                if file_path.name.startswith("__"): continue
-                module_name = f"{package_name}.{file_path.stem}"
+            entries = self._scan_modules(actions_dir, package_name)
+            # Registration touches shared dicts, so it stays on this thread.
+            for module_name, file_path, module, error in self._load_modules(entries):
+                if isinstance(error, ImportError):
+                    logger.error(f"Failed to import action module {module_name}: {error}", exc_info=error)
+                    continue
+                if error is not None:
+                    logger.error(f"Failed to load actions from {file_path.name}: {error}", exc_info=error)
+                    continue
                 try:
-                    # The key to reloading is to invalidate Python's cache
-                    if module_name in inspect.sys.modules:
-                        importlib.reload(inspect.sys.modules[module_name])
-
-                    module = importlib.import_module(module_name)
                     for name, func in inspect.getmembers(module, inspect.isfunction):
                         # Only register the function if it was DEFINED in this module
                         if func.__module__ == module_name:
@@ -105,8 +239,6 @@ class FoundryManager:
                                 logger.warning(f"Action function '{name}' is being overwritten by module '{module_name}'.")
                             self._actions[name] = func
                             logger.debug(f"Registered action function: {name} from {file_path.name}")
-                except ImportError as e:
-                    logger.error(f"Failed to import action module {module_name}: {e}", exc_info=True)
                 except Exception as e:
                     logger.error(f"Failed to load actions from {file_path.name}: {e}", exc_info=True)
         except Exception as e:
@@ -121,14 +253,21 @@ class FoundryManager:
     def get_llm_tool_definitions(self) -> List[Dict[str, Any]]:
         """
         Gets the list of tool definitions in a generic format, ready to be
-        transformed by a provider-specific method if necessary.
+        transformed by a provider-specific method if necessary. The list is
+        cached between rescans and shared by all callers, so it must not be mutated.
+        """
+        if self._tool_defs_cache is None:
+            self._tool_defs_cache = [
+                {"name": bp.id, "description": bp.description, "parameters": bp.parameters}
+                for bp in self._blueprints.values()
+            ]
+        return self._tool_defs_cache
+
+    def get_llm_tool_definitions_json(self) -> str:
+        """
+        The tool definitions as indented JSON for the {available_tools} prompt
+        slot, serialized once per set of blueprints rather than per prompt.
         """
-        definitions: List[Dict[str, Any]] = []
-        for bp in self._blueprints.values():
-            tool_def = {
-                "name": bp.id,
-                "description": bp.description,
-                "parameters": bp.parameters
-            }
-            definitions.append(tool_def)
-        return definitions
+        if self._tool_defs_json_cache is None:
+            self._tool_defs_json_cache = json.dumps(self.get_llm_tool_definitions(), indent=2)
+        return self._tool_defs_json_cache
@@ -0,0 +1,85 @@
+# src/foundry/process_utils.py
+"""
+Shared helper for actions that run a subprocess and report its output.
+"""
+import logging
+import subprocess
+import threading
+from collections import deque
+from typing import IO, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lines of stdout and of stderr kept per command; a runaway test suite can
+# print far more than is useful to report back.
+MAX_OUTPUT_LINES = 2000
+# Characters kept per stream, which also bounds output made of a few huge lines.
+MAX_OUTPUT_CHARS = 1_000_000
+
+
+class _TailReader(threading.Thread):
+    """Drains one pipe line by line, logging each line and keeping only the last ones."""
+
+    def __init__(self, stream: IO[str], label: str, max_lines: int, max_chars: int):
+        super().__init__(daemon=True)
+        self.stream = stream
+        self.label = label
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+        self.lines: deque = deque()
+        self.kept_chars = 0
+        self.total = 0
+        self.dropped_chars = 0
+
+    def run(self):
+        with self.stream:
+            # readline(max_chars) splits an oversized line into pieces, so even a
+            # single unterminated line is never held in memory whole.
+            for line in iter(lambda: self.stream.readline(self.max_chars), ""):
+                self.total += 1
+                logger.debug(f"[{self.label}] {line.rstrip()}")
+                self.lines.append(line)
+                self.kept_chars += len(line)
+                while len(self.lines) > self.max_lines or self.kept_chars > self.max_chars:
+                    oldest = self.lines.popleft()
+                    self.kept_chars -= len(oldest)
+                    self.dropped_chars += len(oldest)
+
+    def text(self) -> str:
+        dropped = self.total - len(self.lines)
+        if dropped:
+            prefix = f"... ({dropped} earlier lines, {self.dropped_chars} characters omitted)\n"
+        elif self.dropped_chars:
+            prefix = f"... ({self.dropped_chars} characters omitted)\n"
+        else:
+            prefix = ""
+        return prefix + "".join(self.lines)
+
+
+def run_streaming(command: List[str], cwd: str, max_lines: int = MAX_OUTPUT_LINES,
+                  max_chars: int = MAX_OUTPUT_CHARS, env: Optional[Dict[str, str]] = None) -> Tuple[int, str, str]:
+    """
+    Runs `command` and returns (returncode, stdout, stderr). Both pipes are read
+    concurrently while the process runs, so the child never blocks on a full
+    pipe, output is logged as it arrives, and memory stays bounded by
+    `max_lines` and `max_chars` per stream (the oldest output is dropped).
+    """
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        cwd=cwd,
+        env=env,
+        shell=False
+    )
+    readers = [_TailReader(process.stdout, "stdout", max_lines, max_chars),
+               _TailReader(process.stderr, "stderr", max_lines, max_chars)]
+    for reader in readers:
+        reader.start()
+    returncode = process.wait()
+    for reader in readers:
+        reader.join()
+    return returncode, readers[0].text(), readers[1].text()
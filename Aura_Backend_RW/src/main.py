@@ -5,6 +5,7 @@ from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from src.db.database import engine
 from src.db import models
 from src.services import mission_control
+from src.foundry.actions import web_actions
 from src.api import auth, agent, keys, assignments, missions, websockets
 
 # This creates your database tables if they don't exist
@@ -24,7 +25,9 @@ app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="*")
 # --- THE FINAL FIX: A robust, regex-based CORS configuration ---
 # This pattern allows your main domain, any Vercel preview URLs, and localhost.
 # It's more flexible and less prone to errors than a static list.
-origins_regex = r"https?://(.*\.)?snowballannotation\.com|https?://localhost(:\d+)?|https?://127\.0\.0\.1(:\d+)?|https://.*\.vercel\.app"
+# Subdomains are matched label by label rather than with '.*', so a non-matching
+# Origin is rejected without backtracking over the whole header.
+origins_regex = r"https?://([\w-]+\.)*snowballannotation\.com|https?://localhost(:\d+)?|https?://127\.0\.0\.1(:\d+)?|https://([\w-]+\.)+vercel\.app"
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,4 +43,10 @@ app.include_router(keys.router, prefix="/api-keys", tags=["Settings"])
 app.include_router(assignments.router, prefix="/api/assignments", tags=["Settings"])
 app.include_router(missions.router, prefix="/api/missions", tags=["Missions"])
 app.include_router(websockets.router, tags=["WebSockets"])
-app.include_router(agent.router, prefix="/agent", tags=["Agent"])
\ No newline at end of file
+app.include_router(agent.router, prefix="/agent", tags=["Agent"])
+
+
+@app.on_event("shutdown")
+async def close_shared_http_session():
+    # Services are built per request, so the app-wide aiohttp session is closed here.
+    await web_actions.close_session()
\ No newline at end of file
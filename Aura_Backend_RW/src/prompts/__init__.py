@@ -4,9 +4,13 @@
 Exports the primary prompt templates used by Aura's AI agents.
 This provides a central point of access for all core system prompts.
 """
-from .coder import CODER_PROMPT, CODER_PROMPT_STREAMING
+from .coder import (
+    CODER_PROMPT, CODER_PROMPT_STREAMING_PREFIX, CODER_PROMPT_STREAMING_SUFFIX_TEMPLATE,
+    CODER_PROMPT_STREAMING_BATCH_SUFFIX_TEMPLATE
+)
 from .creative import (
-    ARCHITECT_PROMPT, SEQUENCER_PROMPT, AURA_REPLANNER_PROMPT, AURA_MISSION_SUMMARY_PROMPT, CREATIVE_ASSISTANT_PROMPT
+    ARCHITECT_PROMPT, SEQUENCER_PROMPT, AURA_REPLANNER_PROMPT, AURA_MISSION_SUMMARY_PROMPT, CREATIVE_ASSISTANT_PROMPT,
+    render_mission_summary
 )
 from .master_rules import (
     JSON_OUTPUT_RULE, RAW_CODE_OUTPUT_RULE, DOCSTRING_RULE, TYPE_HINTING_RULE,
@@ -15,12 +19,15 @@ from .master_rules import (
 
 __all__ = [
     'CODER_PROMPT',
-    'CODER_PROMPT_STREAMING',
+    'CODER_PROMPT_STREAMING_PREFIX',
+    'CODER_PROMPT_STREAMING_SUFFIX_TEMPLATE',
+    'CODER_PROMPT_STREAMING_BATCH_SUFFIX_TEMPLATE',
     'ARCHITECT_PROMPT',
     'SEQUENCER_PROMPT',
     'AURA_REPLANNER_PROMPT',
     'AURA_MISSION_SUMMARY_PROMPT',
     'CREATIVE_ASSISTANT_PROMPT',
+    'render_mission_summary',
     'JSON_OUTPUT_RULE',
     'RAW_CODE_OUTPUT_RULE',
     'DOCSTRING_RULE',
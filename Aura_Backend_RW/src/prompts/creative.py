@@ -1,5 +1,6 @@
 # src/prompts/creative.py
 import textwrap
+from typing import List
 
 # This prompt defines the "Architect" persona, the first step in the new planning assembly line.
 ARCHITECT_PROMPT = textwrap.dedent("""
@@ -199,3 +200,15 @@ CREATIVE_ASSISTANT_PROMPT = textwrap.dedent("""
     Now, provide your conversational response, apennding a tool call block only if necessary.
     """)
 
+
+# Above this many tasks a bare list stops reading as a summary, so the LLM writes one instead.
+MISSION_SUMMARY_TEMPLATE_MAX_TASKS = 20
+
+
+def render_mission_summary(completed_tasks: List[str]) -> str:
+    """Formats the completed task descriptions into the end-of-mission message without an LLM call."""
+    if not completed_tasks:
+        return "Mission accomplished!"
+    steps = "; ".join(task.strip().rstrip(".") for task in completed_tasks)
+    noun = "task" if len(completed_tasks) == 1 else "tasks"
+    return f"Mission accomplished! I completed {len(completed_tasks)} {noun}: {steps}."
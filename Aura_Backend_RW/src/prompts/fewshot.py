@@ -0,0 +1,23 @@
+# src/prompts/fewshot.py
+import logging
+import os
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# How many few-shot examples prompts carry, read once at import from PROMPT_FEWSHOT:
+# "full" (every example, the default), "minimal" (the first only) or "off" (none).
+FEWSHOT_MODES = ("full", "minimal", "off")
+FEWSHOT_MODE = os.getenv("PROMPT_FEWSHOT", "full").strip().lower()
+if FEWSHOT_MODE not in FEWSHOT_MODES:
+    logger.warning(f"Unknown PROMPT_FEWSHOT value '{FEWSHOT_MODE}'; using 'full'.")
+    FEWSHOT_MODE = "full"
+logger.info(f"Prompt few-shot examples: {FEWSHOT_MODE}")
+
+
+def fewshot_block(header: str, examples: List[str]) -> str:
+    """Returns the header and the examples selected by FEWSHOT_MODE, or "" when examples are off."""
+    if FEWSHOT_MODE == "off":
+        return ""
+    selected = examples[:1] if FEWSHOT_MODE == "minimal" else examples
+    return "\n\n".join([header, *selected])
@@ -1,59 +1,46 @@
 # src/prompts/intent.py
 import textwrap
+from .fewshot import fewshot_block
+
+# Few-shot examples for INTENT_DETECTION_PROMPT; PROMPT_FEWSHOT selects how many are included.
+_INTENT_EXAMPLES = [
+    textwrap.dedent("""
+        *EXAMPLE 1:*
+        **History:**
+        Aura: I can help you build applications. What did you have in mind?
+        **User's Message:** "build me a flask app"
+        **Your Response:** PLAN
+        """).strip(),
+    textwrap.dedent("""
+        *EXAMPLE 2:*
+        **History:**
+        Aura: That's a cool idea for a discord bot! We could use the discord.py library. Ready to get started?
+        **User's Message:** "yeah let's do it"
+        **Your Response:** PLAN
+        """).strip(),
+    textwrap.dedent("""
+        *EXAMPLE 3:*
+        **History:**
+        (empty)
+        **User's Message:** "how do you use websockets with fastapi?"
+        **Your Response:** CHAT
+        """).strip(),
+]
 
 INTENT_DETECTION_PROMPT = textwrap.dedent("""
     You are an expert intent detection AI. Your sole purpose is to analyze a user's message within a conversation and determine if their primary intent is to **PLAN** a new software project/feature or to simply **CHAT**.
 
-    **--- PRIMARY DIRECTIVE: THINK, THEN DECIDE ---**
-    You MUST first analyze the user's message in the context of the conversation and explain your reasoning in the `thought` field. After your analysis, you will make a final decision in the `intent` field.
-
     **--- INTENT DEFINITIONS ---**
     - **PLAN:** The user is giving a command or a high-level description of something to be built, created, generated, or implemented. They are signaling readiness to move forward with creating a software plan.
       *Keywords: build, create, make, generate, implement, scaffold, develop, start a new project for, "let's do it", "ok proceed"*
     - **CHAT:** The user is asking a question, brainstorming, making a comment, or having a general conversation. They are not yet ready to commit to a build plan.
       *Keywords: what, how, why, can you, tell me more, that's interesting*
 
-    **--- EXAMPLES ---**
-
-    *EXAMPLE 1:*
-    **History:**
-    Aura: I can help you build applications. What did you have in mind?
-    **User's Message:** "build me a flask app"
-    **Your Response:**
-    ```json
-    {{
-      "thought": "The user explicitly used the keyword 'build' and described a software project. This is a clear signal to create a plan.",
-      "intent": "PLAN"
-    }}
-    ```
-
-    *EXAMPLE 2:*
-    **History:**
-    Aura: That's a cool idea for a discord bot! We could use the discord.py library. Ready to get started?
-    **User's Message:** "yeah let's do it"
-    **Your Response:**
-    ```json
-    {{
-      "thought": "The user's message 'yeah let's do it' is a direct confirmation to my question 'Ready to get started?'. This is an affirmative command to proceed with planning.",
-      "intent": "PLAN"
-    }}
-    ```
-
-    *EXAMPLE 3:*
-    **History:**
-    (empty)
-    **User's Message:** "how do you use websockets with fastapi?"
-    **Your Response:**
-    ```json
-    {{
-      "thought": "The user is asking a 'how-to' question. They are seeking information, not requesting a build. This is a clear intent to chat.",
-      "intent": "CHAT"
-    }}
-    ```
+    {examples}
     ---
 
     **YOUR TASK:**
-    Analyze the following conversation context and respond with a single JSON object containing your `thought` and final `intent`.
+    Classify the user's latest message in the context of the conversation below.
 
     **Conversation History (for context):**
     {conversation_history}
@@ -61,5 +48,5 @@ INTENT_DETECTION_PROMPT = textwrap.dedent("""
     **User's Latest Message:**
     "{user_prompt}"
 
-    Now, provide the JSON response.
-    """)
+    Respond with exactly one word: PLAN or CHAT.
+    """).replace("{examples}", fewshot_block("**--- EXAMPLES ---**", _INTENT_EXAMPLES))
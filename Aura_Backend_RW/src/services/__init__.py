@@ -2,17 +2,39 @@
 """
 Exports the primary service classes that form Aura's operational logic.
 This allows for clean, direct importing of services across the application.
+
+Services are imported on first access, so importing one of them (or a
+submodule such as mission_control) does not pull in chromadb, aiohttp and
+the rest of the services' dependencies.
 """
-from .action_service import ActionService
-from .app_state_service import AppStateService
-from .chunking_service import ChunkingService
-from .command_handler import CommandHandler
-from .conductor_service import ConductorService
-from .development_team_service import DevelopmentTeamService
-from .code_intelligence_service import CodeIntelligenceService
-from .mission_log_service import MissionLogService
-from .tool_runner_service import ToolRunnerService
-from .vector_context_service import VectorContextService
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .action_service import ActionService
+    from .app_state_service import AppStateService
+    from .chunking_service import ChunkingService
+    from .command_handler import CommandHandler
+    from .conductor_service import ConductorService
+    from .development_team_service import DevelopmentTeamService
+    from .code_intelligence_service import CodeIntelligenceService
+    from .mission_log_service import MissionLogService
+    from .tool_runner_service import ToolRunnerService
+    from .vector_context_service import VectorContextService
+
+# {exported name: submodule that defines it}
+_LAZY_EXPORTS = {
+    "ActionService": "action_service",
+    "AppStateService": "app_state_service",
+    "ChunkingService": "chunking_service",
+    "CommandHandler": "command_handler",
+    "ConductorService": "conductor_service",
+    "DevelopmentTeamService": "development_team_service",
+    "CodeIntelligenceService": "code_intelligence_service",
+    "MissionLogService": "mission_log_service",
+    "ToolRunnerService": "tool_runner_service",
+    "VectorContextService": "vector_context_service",
+}
 
 __all__ = [
     "ActionService",
@@ -25,4 +47,18 @@ __all__ = [
     "MissionLogService",
     "ToolRunnerService",
     "VectorContextService",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Cache it so later lookups bypass __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
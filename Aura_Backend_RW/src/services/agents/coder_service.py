@@ -70,8 +70,8 @@ class CoderService:
             relevant_context = f"Error: Could not retrieve context from the vector database. Details: {e}"
 
         # 2. Get the file tree and available tools
-        file_structure = "\n".join(sorted(list(self.project_manager.get_project_files().keys()))) or "The project is currently empty."
-        available_tools = json.dumps(self.foundry_manager.get_llm_tool_definitions(), indent=2)
+        file_structure = self.project_manager.get_file_listing() or "The project is currently empty."
+        available_tools = self.foundry_manager.get_llm_tool_definitions_json()
 
         # 3. Build the prompt
         prompt = CODER_PROMPT.format(
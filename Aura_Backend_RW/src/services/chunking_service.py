@@ -1,6 +1,16 @@
 import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any
+from types import MappingProxyType
+from typing import List, Mapping
+
+
+@dataclass(slots=True, frozen=True)
+class Chunk:
+    """A piece of a document, ready to be embedded."""
+    id: str
+    content: str
+    metadata: Mapping[str, str]
 
 
 class ChunkingService:
@@ -8,11 +18,13 @@ class ChunkingService:
     Smart chunking service for breaking documents into optimal pieces for RAG.
     """
     def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 150):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size.")
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         print("[ChunkingService] Initialized.")
 
-    def chunk_document(self, content: str, file_path_str: str) -> List[Dict[str, Any]]:
+    def chunk_document(self, content: str, file_path_str: str) -> List[Chunk]:
         if not content or not content.strip():
             return []
         file_path = Path(file_path_str)
@@ -25,34 +37,30 @@ class ChunkingService:
         sanitized_path = "_".join(relevant_parts)
         return sanitized_path.replace(file_path.suffix, '').replace('.', '_')
 
-    def _chunk_generic_text(self, content: str, file_path: Path) -> List[Dict[str, Any]]:
+    def _chunk_generic_text(self, content: str, file_path: Path) -> List[Chunk]:
         chunks = []
         file_prefix = self._get_unique_file_prefix(file_path)
         text_chunks = self._split_text_by_size(content)
+        # Every chunk of a file has the same metadata, so they share one read-only mapping.
+        metadata = MappingProxyType({
+            'source': file_path.name,
+            'full_path': str(file_path)
+        })
         for i, chunk_text in enumerate(text_chunks):
             chunks.append(self._create_chunk(
                 chunk_text,
                 chunk_id=f"{file_prefix}_generic_{i}",
-                file_path=file_path
+                metadata=metadata
             ))
         return chunks
 
     def _split_text_by_size(self, text: str) -> List[str]:
-        chunks = []
-        start = 0
-        while start < len(text):
-            end = start + self.chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start = end - self.chunk_overlap
-        return chunks
+        # Windows start every (chunk_size - chunk_overlap) characters. A window starting
+        # within the last chunk_overlap characters would lie wholly inside the previous one.
+        if len(text) <= self.chunk_size:
+            return [text] if text else []
+        step = self.chunk_size - self.chunk_overlap
+        return [text[start:start + self.chunk_size] for start in range(0, len(text) - self.chunk_overlap, step)]
 
-    def _create_chunk(self, content: str, chunk_id: str, file_path: Path) -> Dict[str, Any]:
-        return {
-            'id': chunk_id,
-            'content': content.strip(),
-            'metadata': {
-                'source': file_path.name,
-                'full_path': str(file_path)
-            }
-        }
\ No newline at end of file
+    def _create_chunk(self, content: str, chunk_id: str, metadata: Mapping[str, str]) -> Chunk:
+        return Chunk(id=chunk_id, content=content.strip(), metadata=metadata)
\ No newline at end of file
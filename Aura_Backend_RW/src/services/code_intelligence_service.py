@@ -1,12 +1,19 @@
 # src/services/code_intelligence_service.py
 import ast
+import asyncio
 import logging
+import os
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 from dataclasses import dataclass, field
 
+from src.foundry.ast_utils import get_process_pool, load_tree
+
 logger = logging.getLogger(__name__)
 
+# Below this many files, shipping them to worker processes costs more than parsing in-process.
+PARALLEL_INDEX_MIN_FILES = 64
+
 
 @dataclass
 class CodeSymbol:
@@ -19,61 +26,71 @@ class CodeSymbol:
     calls: Set[str] = field(default_factory=set)  # Names of functions/methods this symbol calls
 
 
-class SymbolVisitor(ast.NodeVisitor):
-    """An AST visitor to find symbol definitions and their internal calls."""
-
-    def __init__(self, file_path: str):
-        self.file_path = file_path
-        self.symbols: List[CodeSymbol] = []
-        self.current_class: Optional[str] = None
-
-    def visit_ClassDef(self, node: ast.ClassDef):
-        self.symbols.append(CodeSymbol(
-            name=node.name,
-            file_path=self.file_path,
-            line_number=node.lineno,
-            node_type='class'
-        ))
-        self.current_class = node.name
-        self.generic_visit(node)
-        self.current_class = None
-
-    def _process_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef):
-        node_type = 'method' if self.current_class else 'function'
-        symbol = CodeSymbol(
-            name=node.name,
-            file_path=self.file_path,
-            line_number=node.lineno,
-            node_type=node_type,
-            parent_class=self.current_class
-        )
-        # Find calls within this function
-        call_visitor = CallVisitor()
-        call_visitor.visit(node)
-        symbol.calls = call_visitor.calls
-        self.symbols.append(symbol)
-        # We don't call generic_visit here to avoid recursion into nested functions for now
-
-    def visit_FunctionDef(self, node: ast.FunctionDef):
-        self._process_function(node)
-
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
-        self._process_function(node)
-
-
-class CallVisitor(ast.NodeVisitor):
-    """A focused visitor to find function/method calls within a specific node."""
+def _collect_calls(node: ast.AST) -> Set[str]:
+    """Names of the functions and methods called anywhere inside `node`."""
+    calls: Set[str] = set()
+    for child in ast.walk(node):
+        if child.__class__ is ast.Call:
+            func = child.func
+            if isinstance(func, ast.Name):
+                calls.add(func.id)
+            elif isinstance(func, ast.Attribute):
+                # This captures method calls like `self.some_method()` or `other.func()`
+                calls.add(func.attr)
+    return calls
 
-    def __init__(self):
-        self.calls: Set[str] = set()
 
-    def visit_Call(self, node: ast.Call):
-        if isinstance(node.func, ast.Name):
-            self.calls.add(node.func.id)
-        elif isinstance(node.func, ast.Attribute):
-            # This captures method calls like `self.some_method()` or `other.func()`
-            self.calls.add(node.func.attr)
-        self.generic_visit(node)
+def extract_symbols(tree: ast.AST, file_path: str) -> List[CodeSymbol]:
+    """
+    Finds the class, function and method definitions in `tree`, in source
+    order, with the calls each function makes. Walks the tree with an explicit
+    stack instead of a recursive NodeVisitor, which saves a Python call per node.
+    """
+    symbols: List[CodeSymbol] = []
+    # (node, name of the enclosing class or None)
+    stack: List[tuple] = [(tree, None)]
+    pop, push = stack.pop, stack.append
+    iter_child_nodes = ast.iter_child_nodes
+    while stack:
+        node, current_class = pop()
+        node_class = node.__class__
+        if node_class is ast.ClassDef:
+            symbols.append(CodeSymbol(
+                name=node.name,
+                file_path=file_path,
+                line_number=node.lineno,
+                node_type='class'
+            ))
+            current_class = node.name
+        elif node_class is ast.FunctionDef or node_class is ast.AsyncFunctionDef:
+            symbols.append(CodeSymbol(
+                name=node.name,
+                file_path=file_path,
+                line_number=node.lineno,
+                node_type='method' if current_class else 'function',
+                parent_class=current_class,
+                calls=_collect_calls(node)
+            ))
+            # Nested functions count towards the calls but are not indexed as symbols.
+            continue
+        # Pushed in reverse so that children are popped, and symbols found, in source order.
+        for child in reversed(list(iter_child_nodes(node))):
+            push((child, current_class))
+    return symbols
+
+
+def _parse_file(file_path: Path, relative_path_str: str) -> Optional[List[CodeSymbol]]:
+    """
+    Reads and parses one Python file and returns its symbols, or None if it
+    could not be read or parsed. Runs in worker processes, so it must stay
+    top-level and never raise.
+    """
+    try:
+        content = file_path.read_text(encoding='utf-8')
+        return extract_symbols(ast.parse(content), relative_path_str)
+    except Exception as e:
+        logger.warning(f"Could not process file {file_path} for code index: {e}")
+        return None
 
 
 class CodeIntelligenceService:
@@ -104,23 +121,31 @@ class CodeIntelligenceService:
 
         logger.info("Building project-wide code intelligence index...")
         ignore_dirs = {'.git', '.venv', 'venv', '__pycache__', '.rag_db', 'node_modules'}
-        py_files = [p for p in self.project_root.rglob("*.py") if
-                    not any(excluded in p.parts for excluded in ignore_dirs)]
-
-        for file_path in py_files:
-            try:
-                content = file_path.read_text(encoding='utf-8')
-                await self.update_index_for_file(file_path, content)
-            except Exception as e:
-                logger.warning(f"Could not process file {file_path} for code index: {e}")
+        # os.walk lets us prune ignored directories so their subtrees are never visited.
+        py_files = []
+        for dirpath, dirnames, filenames in os.walk(self.project_root):
+            dirnames[:] = [d for d in dirnames if d not in ignore_dirs]
+            py_files.extend(Path(dirpath) / f for f in filenames if f.endswith('.py'))
+
+        # Files are read and parsed off the event loop, across processes for large
+        # projects; the index itself is only touched here, on the loop.
+        loop = asyncio.get_running_loop()
+        executor = get_process_pool() if len(py_files) >= PARALLEL_INDEX_MIN_FILES else None
+        relative_paths = [str(file_path.relative_to(self.project_root)) for file_path in py_files]
+        futures = [loop.run_in_executor(executor, _parse_file, file_path, relative_path_str)
+                   for file_path, relative_path_str in zip(py_files, relative_paths)]
+        try:
+            for relative_path_str, future in zip(relative_paths, futures):
+                self._replace_file_symbols(relative_path_str, await future or [])
+        finally:
+            # The pool is shared, so only this build's queued work is cancelled.
+            for future in futures:
+                future.cancel()
 
         logger.info(f"Code intelligence index built. Found {len(self._symbol_definitions)} unique symbol names.")
 
-    async def update_index_for_file(self, file_path: Path, content: str):
-        """Updates the index for a single file."""
-        if not self.project_root: return
-        relative_path_str = str(file_path.relative_to(self.project_root))
-
+    def _replace_file_symbols(self, relative_path_str: str, symbols: List[CodeSymbol]):
+        """Drops the symbols indexed for a file and records `symbols` in their place."""
         if relative_path_str in self._file_to_symbols:
             for symbol_name in self._file_to_symbols[relative_path_str]:
                 if symbol_name in self._symbol_definitions:
@@ -131,21 +156,26 @@ class CodeIntelligenceService:
                         del self._symbol_definitions[symbol_name]
             del self._file_to_symbols[relative_path_str]
 
+        new_symbol_names = []
+        for symbol in symbols:
+            if symbol.name not in self._symbol_definitions: self._symbol_definitions[symbol.name] = []
+            self._symbol_definitions[symbol.name].append(symbol)
+            new_symbol_names.append(symbol.name)
+
+        if new_symbol_names: self._file_to_symbols[relative_path_str] = new_symbol_names
+
+    async def update_index_for_file(self, file_path: Path, content: str):
+        """Updates the index for a single file."""
+        if not self.project_root: return
+        relative_path_str = str(file_path.relative_to(self.project_root))
+
         try:
-            tree = ast.parse(content)
-            visitor = SymbolVisitor(relative_path_str)
-            visitor.visit(tree)
-
-            new_symbol_names = []
-            for symbol in visitor.symbols:
-                if symbol.name not in self._symbol_definitions: self._symbol_definitions[symbol.name] = []
-                self._symbol_definitions[symbol.name].append(symbol)
-                new_symbol_names.append(symbol.name)
-
-            if new_symbol_names: self._file_to_symbols[relative_path_str] = new_symbol_names
-            logger.debug(f"Updated index for '{relative_path_str}', found {len(new_symbol_names)} symbols.")
+            symbols = extract_symbols(load_tree(content).tree, relative_path_str)
         except (SyntaxError, TypeError) as e:
             logger.warning(f"Syntax error in {relative_path_str}, cannot update code index: {e}")
+            symbols = []
+        self._replace_file_symbols(relative_path_str, symbols)
+        logger.debug(f"Updated index for '{relative_path_str}', found {len(symbols)} symbols.")
 
     def find_symbol_definition(self, symbol_name: str) -> List[CodeSymbol]:
         """Finds the definition(s) of a symbol by name."""
@@ -114,9 +114,8 @@ class ConductorService:
                     context_parts.append(f"```python\n# {source_info}\n{chunk['document']}\n```")
                 vector_context = "\n\n".join(context_parts)
 
-        file_structure = "\n".join(
-            sorted(project_manager.get_project_files().keys())) or "The project is currently empty."
-        available_tools_json = json.dumps(foundry_manager.get_llm_tool_definitions(), indent=2)
+        file_structure = project_manager.get_file_listing() or "The project is currently empty."
+        available_tools_json = foundry_manager.get_llm_tool_definitions_json()
 
         prompt = CODER_PROMPT.format(
             current_task=current_task_description,
@@ -194,7 +193,7 @@ class ConductorService:
         if not git_diff or not git_diff.strip():
             self.log("info", "No code changes detected. Skipping final polish.")
             return
-        file_tree = "\n".join(sorted(project_manager.get_project_files().keys()))
+        file_tree = project_manager.get_file_listing()
         fixes = await development_team_service.run_final_polish_linter(
             user_id, self.original_user_goal, file_tree, git_diff
         )
@@ -7,7 +7,7 @@ import json
 import re
 import os
 import aiohttp
-from typing import TYPE_CHECKING, Dict, List, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Union
 from sqlalchemy.orm import Session
 from pathlib import Path
 import logging
@@ -15,16 +15,23 @@ import logging
 from src.core.websockets import websocket_manager
 from src.event_bus import EventBus
 from src.prompts.creative import (ARCHITECT_PROMPT, SEQUENCER_PROMPT, AURA_REPLANNER_PROMPT,
-                                  AURA_MISSION_SUMMARY_PROMPT)
+                                  AURA_MISSION_SUMMARY_PROMPT, MISSION_SUMMARY_TEMPLATE_MAX_TASKS,
+                                  render_mission_summary)
 from src.prompts.intent import INTENT_DETECTION_PROMPT
 from src.prompts.auditor import AUDITOR_PROMPT
-from src.prompts.coder import CODER_PROMPT_STREAMING
-from src.prompts.master_rules import SENIOR_ARCHITECT_HEURISTIC_RULE, TYPE_HINTING_RULE, DOCSTRING_RULE, \
-    CLEAN_CODE_RULE, MAESTRO_CODER_PHILOSOPHY_RULE, RAW_CODE_OUTPUT_RULE
+from src.prompts.coder import (CODER_PROMPT_STREAMING_PREFIX, CODER_PROMPT_STREAMING_SUFFIX_TEMPLATE,
+                               CODER_PROMPT_STREAMING_BATCH_SUFFIX_TEMPLATE)
 from src.prompts.companion import COMPANION_PROMPT
 from src.db import crud
 from src.services import mission_control
-from src.prompts.polish import METICULOUS_LINTER_PROMPT
+from src.services.intent_cache import INTENT_CACHE, IntentCache
+from src.prompts.polish import METICULOUS_LINTER_PROMPT_PREFIX, METICULOUS_LINTER_PROMPT_SUFFIX_TEMPLATE
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 if TYPE_CHECKING:
     from src.core.managers import ServiceManager
@@ -32,6 +39,16 @@ if TYPE_CHECKING:
 # Setup basic logging
 logger = logging.getLogger(__name__)
 
+# The whole reply must be the label, give or take markdown and punctuation around it.
+INTENT_LABEL_RE = re.compile(r"[\s`*_#>'\".:!-]*(PLAN|CHAT)[\s`*_'\".:!-]*", re.IGNORECASE)
+# The outermost {...} span of a response that wraps its JSON in prose or fences.
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def _loads(text: str) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers' handlers still apply.
+    return orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
+
 
 class DevelopmentTeamService:
     """
@@ -65,7 +82,11 @@ class DevelopmentTeamService:
     async def unified_llm_streamer(self, user_id: int, role: str, messages: List[Dict[str, Any]],
                                    is_json: bool = False, tools: Optional[List[Dict[str, Any]]] = None,
                                    stream_to_user_socket_as: Optional[str] = None,
-                                   file_path: Optional[str] = None) -> str:
+                                   file_path: Optional[str] = None, broadcast: bool = True) -> str:
+        """
+        Streams one LLM call and returns its final reply. With broadcast=False nothing
+        is forwarded to the user's socket, for calls whose output may be discarded.
+        """
         llm_client = self.service_manager.llm_client
         db = self.service_manager.db
         if not self.llm_server_url:
@@ -107,13 +128,14 @@ class DevelopmentTeamService:
                         if not line: continue
                         try:
                             data = json.loads(line)
-                            if data.get("type") == "chunk" and stream_to_user_socket_as:
-                                await websocket_manager.broadcast_to_user({
-                                    "type": stream_to_user_socket_as,
-                                    "content": {"filePath": file_path, "chunk": data.get("content", "")}
-                                }, str(user_id))
-                            else:
-                                await websocket_manager.broadcast_to_user(data, str(user_id))
+                            if broadcast:
+                                if data.get("type") == "chunk" and stream_to_user_socket_as:
+                                    await websocket_manager.broadcast_to_user({
+                                        "type": stream_to_user_socket_as,
+                                        "content": {"filePath": file_path, "chunk": data.get("content", "")}
+                                    }, str(user_id))
+                                else:
+                                    await websocket_manager.broadcast_to_user(data, str(user_id))
 
                             if "final_response" in data and "reply" in data["final_response"]:
                                 final_reply = data["final_response"]["reply"]
@@ -133,12 +155,12 @@ class DevelopmentTeamService:
 
     def parse_json_response(self, response: str) -> dict:
         try:
-            return json.loads(response)
+            return _loads(response)
         except json.JSONDecodeError:
-            match = re.search(r'\{.*\}', response, re.DOTALL)
+            match = JSON_OBJECT_RE.search(response)
             if not match:
                 raise ValueError(f"No JSON object found in the response. Raw response: {response}")
-            return json.loads(match.group(0))
+            return _loads(match.group(0))
 
     async def _run_plan_audit(self, user_id: str, user_prompt: str, blueprint: Dict) -> bool:
         """
@@ -175,6 +197,9 @@ class DevelopmentTeamService:
                                         project_name: str):
         """
         Orchestrates the new three-step planning assembly line: Architect -> Auditor -> Sequencer.
+        The Auditor and Sequencer both work only from the Architect's final
+        blueprint, so the Sequencer starts alongside the audit without streaming to
+        the user, and is cancelled if the audit fails.
         """
         self.log("info", f"Aura planning assembly line initiated for user {user_id}: '{user_idea[:50]}...'")
         self.refresh_llm_assignments()
@@ -199,16 +224,22 @@ class DevelopmentTeamService:
             await self.handle_error(user_id, "Architect", f"Failed to create a valid blueprint: {e}.")
             return
 
-        # --- Phase 2: Auditor (NEW) ---
-        audit_passed = await self._run_plan_audit(user_id, user_idea, final_blueprint)
+        # --- Phases 2 & 3: Auditor, with the Sequencer running quietly behind it ---
+        sequencer_prompt = SEQUENCER_PROMPT.format(blueprint=json.dumps(final_blueprint, indent=2))
+        messages = [{"role": "user", "content": sequencer_prompt}]
+        sequencer_task = asyncio.create_task(
+            self.unified_llm_streamer(int(user_id), "planner", messages, is_json=True, broadcast=False)
+        )
+        try:
+            audit_passed = await self._run_plan_audit(user_id, user_idea, final_blueprint)
+        except BaseException:
+            sequencer_task.cancel()
+            raise
         if not audit_passed:
+            sequencer_task.cancel()
             return  # Stop the entire process if the audit fails.
-
-        # --- Phase 3: Sequencer ---
         await self._post_chat_message(user_id, "Sequencer", "Breaking down blueprint into a step-by-step task list...")
-        sequencer_prompt = SEQUENCER_PROMPT.format(blueprint=json.dumps(final_blueprint, indent=2))
-        messages = [{"role": "user", "content": sequencer_prompt}]
-        plan_response = await self.unified_llm_streamer(int(user_id), "planner", messages, is_json=True)
+        plan_response = await sequencer_task
 
         if not plan_response or plan_response.strip().startswith("Error:"):
             await self.handle_error(user_id, "Sequencer", plan_response or "Sequencer AI returned an empty response.")
@@ -236,6 +267,12 @@ class DevelopmentTeamService:
 
     async def determine_user_intent(self, user_id: str, user_prompt: str, conversation_history: list) -> str:
         self.log("info", f"Determining intent for user {user_id}: '{user_prompt[:50]}...'")
+        context_key = IntentCache.context_key(user_id, conversation_history)
+        cached_intent = INTENT_CACHE.lookup(context_key, user_prompt)
+        if cached_intent is not None:
+            self.log("info", f"Detected user intent (cached): {cached_intent}")
+            return cached_intent
+
         history_str = "\n".join([f"{msg['role']}: {msg['content']}" for msg in conversation_history])
         prompt = INTENT_DETECTION_PROMPT.format(
             conversation_history=history_str,
@@ -243,22 +280,20 @@ class DevelopmentTeamService:
         )
         messages = [{"role": "user", "content": prompt}]
         self.refresh_llm_assignments()
-        response_str = await self.unified_llm_streamer(int(user_id), "planner", messages, is_json=True)
+        response_str = await self.unified_llm_streamer(int(user_id), "planner", messages)
         if not response_str or response_str.startswith("Error:"):
             await self.handle_error(user_id, "IntentDetector",
                                     response_str or "Intent detector returned an empty response.")
             return "CHAT"
-        try:
-            intent_data = self.parse_json_response(response_str)
-            intent = intent_data.get("intent", "CHAT").upper()
-            if intent not in ["PLAN", "CHAT"]:
-                self.log("warning", f"Intent detector returned invalid intent: {intent}. Defaulting to CHAT.")
-                return "CHAT"
-            self.log("info", f"Detected user intent: {intent}")
-            return intent
-        except (ValueError, json.JSONDecodeError) as e:
-            await self.handle_error(user_id, "IntentDetector", f"Failed to parse intent JSON: {e}. Raw: {response_str}")
+        # The prompt asks for a bare PLAN/CHAT label; tolerate markdown or trailing punctuation around it.
+        match = INTENT_LABEL_RE.fullmatch(response_str)
+        if not match:
+            self.log("warning", f"Intent detector returned invalid intent: {response_str[:50]}. Defaulting to CHAT.")
             return "CHAT"
+        intent = match.group(1).upper()
+        self.log("info", f"Detected user intent: {intent}")
+        INTENT_CACHE.store(context_key, user_prompt, intent)
+        return intent
 
     async def run_companion_chat(self, user_id: str, user_prompt: str, conversation_history: list) -> str:
         self.log("info", f"Companion chat initiated for user {user_id}: '{user_prompt[:50]}...'")
@@ -292,24 +327,29 @@ class DevelopmentTeamService:
             context_lines.append(f"Next Task (ID {next_task['id']}): {next_task['description']} [Status: Pending]")
         return "\n".join(context_lines)
 
-    async def generate_code_for_task(self, user_id: str, path: str, task_description: str, user_idea: str,
-                                      current_task_id: int) -> str:
+    def _coder_context(self, current_task_id: int) -> Dict[str, str]:
+        """The project context shared by the single-file and batch coder prompts."""
         project_manager = self.service_manager.project_manager
         mission_log_service = self.service_manager.mission_log_service
-        self.log("info", f"Generating code for '{path}'...")
         schema_content = project_manager.read_file('src/schemas.py') or "# src/schemas.py not found or is empty."
         models_content = project_manager.read_file('src/models.py') or "# src/models.py not found or is empty."
         schema_and_models_context = f"--- Contents of src/schemas.py ---\n{schema_content}\n\n--- Contents of src/models.py ---\n{models_content}"
-        file_tree = "\n".join(sorted(project_manager.get_project_files().keys())) or "The project is currently empty."
+        file_tree = project_manager.get_file_listing() or "The project is currently empty."
         full_plan = mission_log_service.get_tasks()
         relevant_plan_context = self._get_relevant_plan_context(current_task_id, full_plan)
-        prompt = CODER_PROMPT_STREAMING.format(
-            path=path, task_description=task_description, file_tree=file_tree, user_idea=user_idea,
-            relevant_plan_context=relevant_plan_context,
-            schema_and_models_context=schema_and_models_context,
-            MAESTRO_CODER_PHILOSOPHY_RULE=MAESTRO_CODER_PHILOSOPHY_RULE.strip(),
-            TYPE_HINTING_RULE=TYPE_HINTING_RULE.strip(), DOCSTRING_RULE=DOCSTRING_RULE.strip(),
-            CLEAN_CODE_RULE=CLEAN_CODE_RULE.strip(), RAW_CODE_OUTPUT_RULE=RAW_CODE_OUTPUT_RULE.strip())
+        return {
+            "schema_and_models_context": schema_and_models_context,
+            "file_tree": file_tree,
+            "relevant_plan_context": relevant_plan_context,
+        }
+
+    async def generate_code_for_task(self, user_id: str, path: str, task_description: str, user_idea: str,
+                                      current_task_id: int) -> str:
+        self.log("info", f"Generating code for '{path}'...")
+        # Static laws first, per-file context last, so the prefix can be served from the provider's prompt cache.
+        prompt = CODER_PROMPT_STREAMING_PREFIX + CODER_PROMPT_STREAMING_SUFFIX_TEMPLATE.format(
+            path=path, task_description=task_description, user_idea=user_idea,
+            **self._coder_context(current_task_id))
         messages = [{"role": "user", "content": prompt}]
         self.refresh_llm_assignments()
         full_code = await self.unified_llm_streamer(int(user_id), "coder", messages,
@@ -328,6 +368,50 @@ class DevelopmentTeamService:
         except SyntaxError as e:
             return f"Error: AI-generated code for '{path}' has a syntax error: {e}"
 
+    async def generate_code_for_tasks(self, user_id: str, files: List[Dict[str, str]], user_idea: str,
+                                       current_task_id: int) -> Union[Dict[str, str], str]:
+        """
+        Generates several independent files ({"path", "task_description"} each)
+        with a single coder call, sharing the prompt's laws and project context
+        between them. Returns {path: code}, or an "Error: ..." string if any file
+        is missing from the response or is not valid Python.
+        """
+        paths = [f["path"] for f in files]
+        self.log("info", f"Generating code for {len(files)} files in one batch: {', '.join(paths)}")
+        files_json = json.dumps(
+            [{"index": i, "path": f["path"], "task_description": f["task_description"]} for i, f in enumerate(files, start=1)],
+            indent=2)
+        prompt = CODER_PROMPT_STREAMING_PREFIX + CODER_PROMPT_STREAMING_BATCH_SUFFIX_TEMPLATE.format(
+            files_json=files_json, file_count=len(files), user_idea=user_idea,
+            **self._coder_context(current_task_id))
+        messages = [{"role": "user", "content": prompt}]
+        self.refresh_llm_assignments()
+        response = await self.unified_llm_streamer(int(user_id), "coder", messages)
+        if response.startswith("Error:"):
+            return response
+
+        file_block_regex = re.compile(r'<file\s+index\s*=\s*["\']?(\d+)["\']?\s*>(.*?)</file>', re.DOTALL)
+        fence_regex = re.compile(r'^\s*```[\w-]*\n(.*?)```\s*$', re.DOTALL)
+        code_by_index = {}
+        for match in file_block_regex.finditer(response):
+            body = match.group(2)
+            fenced = fence_regex.match(body)
+            code_by_index[int(match.group(1))] = (fenced.group(1) if fenced else body).strip()
+
+        generated = {}
+        for index, path in enumerate(paths, start=1):
+            code = code_by_index.get(index)
+            if not code:
+                return f"Error: The AI failed to generate code for '{path}' (file {index} of the batch)."
+            if path.endswith(".py"):
+                try:
+                    ast.parse(code)
+                except SyntaxError as e:
+                    return f"Error: AI-generated code for '{path}' has a syntax error: {e}"
+            generated[path] = code
+        self.log("success", f"Generated code for {len(generated)} files in one batch.")
+        return generated
+
     async def run_strategic_replan(self, user_id: str, original_goal: str, failed_task: Dict, mission_log: List[Dict]):
         mission_log_service = self.service_manager.mission_log_service
         self.log("info", "Strategic re-plan initiated.")
@@ -365,7 +449,7 @@ class DevelopmentTeamService:
         await self._post_chat_message(user_id, "Conductor",
                                       "Code generation complete. Performing final quality review...")
 
-        prompt = METICULOUS_LINTER_PROMPT.format(
+        prompt = METICULOUS_LINTER_PROMPT_PREFIX + METICULOUS_LINTER_PROMPT_SUFFIX_TEMPLATE.format(
             user_idea=user_idea,
             file_tree=file_tree,
             git_diff=git_diff
@@ -399,9 +483,10 @@ class DevelopmentTeamService:
             return []
 
     async def generate_mission_summary(self, user_id: str, completed_tasks: List[Dict]) -> str:
-        task_descriptions = "\n".join([f"- {task['description']}" for task in completed_tasks if task['done']])
-        if not task_descriptions:
-            return "Mission accomplished!"
+        done_descriptions = [task['description'] for task in completed_tasks if task['done']]
+        if len(done_descriptions) <= MISSION_SUMMARY_TEMPLATE_MAX_TASKS:
+            return render_mission_summary(done_descriptions)
+        task_descriptions = "\n".join(f"- {description}" for description in done_descriptions)
         prompt = AURA_MISSION_SUMMARY_PROMPT.format(completed_tasks=task_descriptions)
         messages = [{"role": "user", "content": prompt}]
         self.refresh_llm_assignments()
@@ -0,0 +1,52 @@
+# src/services/intent_cache.py
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class IntentCache:
+    """
+    Remembers classified intents so that repeated messages ("build me...",
+    "thanks") skip the intent-detection LLM call. Entries are scoped to the
+    user and the last two conversation turns, since the same words can mean
+    PLAN after one exchange and CHAT after another, and are matched on the
+    whitespace- and case-normalized message.
+
+    Services are built per request, so one instance (INTENT_CACHE) is shared
+    for the life of the process. Call it from the event loop only.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        # {(context key, normalized message): intent}, least recently used first.
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+
+    @staticmethod
+    def context_key(user_id: str, conversation_history: list) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        # Per user, so that first messages (empty history) are not shared across users.
+        digest.update(f"{user_id}\0".encode('utf-8'))
+        for msg in conversation_history[-2:]:
+            digest.update(f"{msg.get('role')}\0{msg.get('content')}\0".encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _normalize(message: str) -> str:
+        return " ".join(message.lower().split())
+
+    def lookup(self, context_key: str, message: str) -> Optional[str]:
+        key = (context_key, self._normalize(message))
+        intent = self._entries.get(key)
+        if intent is not None:
+            self._entries.move_to_end(key)
+        return intent
+
+    def store(self, context_key: str, message: str, intent: str) -> None:
+        key = (context_key, self._normalize(message))
+        self._entries[key] = intent
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+INTENT_CACHE = IntentCache()
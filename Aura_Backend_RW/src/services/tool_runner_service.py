@@ -30,7 +30,7 @@ class ToolRunnerService:
         self.service_manager = service_manager
         self.PATH_PARAM_KEYS = ['path', 'source_path', 'destination_path', 'requirements_path']
         self.FILESYSTEM_TOOLS = [
-            'write_file', 'append_to_file', 'create_directory', 'create_package_init',
+            'write_file', 'write_files', 'append_to_file', 'create_directory', 'create_package_init',
             'delete_directory', 'copy_file', 'move_file', 'delete_file',
             'add_dependency_to_requirements'
         ]
@@ -120,8 +120,13 @@ class ToolRunnerService:
                     "content": file_tree
                 }, user_id)
 
+                written_paths = []
                 if action_id == 'write_file' and 'path' in execution_params:
-                    file_path_str = execution_params['path']
+                    written_paths = [execution_params['path']]
+                elif action_id == 'write_files':
+                    written_paths = [str(project_manager.active_project_path / entry['path'])
+                                     for entry in execution_params.get('files', [])]
+                for file_path_str in written_paths:
                     try:
                         content = Path(file_path_str).read_text(encoding='utf-8')
                         relative_path = str(Path(file_path_str).relative_to(project_manager.active_project_path))
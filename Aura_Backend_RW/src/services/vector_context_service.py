@@ -1,13 +1,15 @@
 # src/services/vector_context_service.py
+import asyncio
+import hashlib
 import logging
 import chromadb
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 from sqlalchemy.orm import Session
 from src.db import crud
 from pathlib import Path
-import ast
+from src.foundry.ast_utils import iter_definition_sources, load_tree
 from .chunking_service import ChunkingService
 
 logger = logging.getLogger(__name__)
@@ -19,6 +21,11 @@ class VectorContextService:
         self.client = None
         self.collection = None
         self.project_root: Path | None = None
+        # Queued reindexes (background and awaited alike), and the most recent
+        # one per file so reindexes of the same file apply in order.
+        self._reindex_tasks: Set[asyncio.Task] = set()
+        self._latest_reindex: Dict[Path, asyncio.Task] = {}
+        self._reindex_semaphore = asyncio.Semaphore(4)
         self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
             model_name="all-MiniLM-L6-v2"
         )
@@ -47,6 +54,25 @@ class VectorContextService:
         )
         logger.info(f"Vector database loaded. Collection '{self.collection.name}' has {self.collection.count()} items.")
 
+    @staticmethod
+    def _document_id(meta: Dict[str, Any]) -> str:
+        return f"{meta['file_path']}-{meta.get('node_type', 'file')}-{meta.get('node_name', '')}"
+
+    @staticmethod
+    def _content_hash(document: str) -> str:
+        return hashlib.blake2b(document.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _embeddings_for_hashes(self, content_hashes: List[str]) -> Dict[str, List[float]]:
+        """Returns {content_hash: embedding} for chunks already stored with one of `content_hashes`."""
+        try:
+            existing = self.collection.get(
+                where={"content_hash": {"$in": content_hashes}}, include=["metadatas", "embeddings"]
+            )
+        except Exception as e:
+            logger.warning(f"Could not look up existing embeddings by content hash: {e}")
+            return {}
+        return {meta["content_hash"]: embedding for meta, embedding in zip(existing["metadatas"], existing["embeddings"])}
+
     def _ensure_project_loaded(self):
         if not self.collection or not self.client or not self.project_root:
             raise RuntimeError("VectorContextService has not been loaded for a project. Call load_for_project() first.")
@@ -57,15 +83,38 @@ class VectorContextService:
             logger.warning("add_documents called with no documents.")
             return
 
-        ids = [f"{meta['file_path']}-{meta.get('node_type', 'file')}-{meta.get('node_name', '')}" for meta in metadatas]
+        ids = [self._document_id(meta) for meta in metadatas]
+
+        # Identical chunks (boilerplate classes, empty __init__ helpers, ...) share
+        # one embedding: reuse a stored vector for known content and embed each
+        # new text only once per batch.
+        content_hashes = [self._content_hash(document) for document in documents]
+        for meta, content_hash in zip(metadatas, content_hashes):
+            meta["content_hash"] = content_hash
+        embeddings = self._embeddings_for_hashes(list(set(content_hashes)))
+        to_embed = {}
+        for document, content_hash in zip(documents, content_hashes):
+            if content_hash not in embeddings:
+                to_embed.setdefault(content_hash, document)
+        if to_embed:
+            embeddings.update(zip(to_embed.keys(), self.embedding_function(list(to_embed.values()))))
 
         self.collection.upsert(
             documents=documents,
             metadatas=metadatas,
+            embeddings=[embeddings[content_hash] for content_hash in content_hashes],
             ids=ids
         )
         logger.info(f"Successfully added/updated documents. Collection now has {self.collection.count()} items.")
 
+    async def delete_documents_for_file(self, relative_path_str: str):
+        """Removes every chunk indexed for the file at `relative_path_str`."""
+        self._ensure_project_loaded()
+        try:
+            self.collection.delete(where={"file_path": relative_path_str})
+        except Exception as e:
+            logger.error(f"Error deleting chunks from ChromaDB for {relative_path_str}: {e}")
+
     async def query(self, query_text: str, n_results: int = 5) -> List[Dict[str, Any]]:
         self._ensure_project_loaded()
         if self.collection.count() == 0:
@@ -87,34 +136,36 @@ class VectorContextService:
         return retrieved_docs
 
     async def reindex_file(self, file_path: Path, content: str):
+        """
+        Brings the file's chunks in line with `content`. Only chunks whose text
+        changed (or that are new) are re-embedded; chunks for symbols that no
+        longer exist are deleted, and unchanged ones are left alone.
+
+        Goes through the same per-file queue as schedule_reindex_file, so a
+        reindex of an older version that is still pending can never finish last.
+        """
+        await self._enqueue_reindex(file_path, content, log_errors=False)
+
+    async def _reindex_file(self, file_path: Path, content: str):
         self._ensure_project_loaded()
         relative_path_str = str(file_path.relative_to(self.project_root))
 
         logger.info(f"Re-indexing file: {relative_path_str}")
-        try:
-            self.collection.delete(where={"file_path": relative_path_str})
-            logger.info(f"Deleted old vector chunks for file. Collection count: {self.collection.count()}")
-        except Exception as e:
-            logger.error(f"Error deleting chunks from ChromaDB for {relative_path_str}: {e}")
-
         documents = []
         metadatas = []
         try:
-            tree = ast.parse(content)
-            for node in tree.body:
-                if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
-                    source_code = ast.unparse(node)
-                    node_type = "function" if isinstance(node, ast.FunctionDef) else "class"
-                    documents.append(source_code)
-                    metadatas.append({
-                        "file_path": relative_path_str, "node_type": node_type, "node_name": node.name,
-                    })
+            tree = load_tree(content).tree
+            for node_type, node_name, source_code in iter_definition_sources(content, tree):
+                documents.append(source_code)
+                metadatas.append({
+                    "file_path": relative_path_str, "node_type": node_type, "node_name": node_name,
+                })
         except SyntaxError:
             logger.warning(f"File {relative_path_str} is not valid Python. Indexing as plain text.")
             chunker = ChunkingService()
             text_chunks = chunker.chunk_document(content, str(file_path))
             for i, chunk in enumerate(text_chunks):
-                documents.append(chunk['content'])
+                documents.append(chunk.content)
                 metadatas.append({
                     "file_path": relative_path_str, "node_type": "text_chunk", "node_name": f"chunk_{i}",
                 })
@@ -122,12 +173,79 @@ class VectorContextService:
             logger.error(f"Failed to parse file {relative_path_str} with AST: {e}")
             return
 
-        if not documents:
-            logger.info(f"No functions or classes found in {relative_path_str}. Nothing new to index.")
+        try:
+            existing = self.collection.get(where={"file_path": relative_path_str}, include=["documents"])
+            indexed_documents = dict(zip(existing["ids"], existing["documents"]))
+        except Exception as e:
+            logger.error(f"Error reading existing chunks from ChromaDB for {relative_path_str}: {e}")
+            indexed_documents = None
+
+        if indexed_documents is None:
+            # Fall back to a full replace of the file's chunks.
+            try:
+                self.collection.delete(where={"file_path": relative_path_str})
+            except Exception as e:
+                logger.error(f"Error deleting chunks from ChromaDB for {relative_path_str}: {e}")
+            changed_documents, changed_metadatas = documents, metadatas
+        else:
+            new_ids = {self._document_id(meta) for meta in metadatas}
+            stale_ids = [doc_id for doc_id in indexed_documents if doc_id not in new_ids]
+            if stale_ids:
+                try:
+                    self.collection.delete(ids=stale_ids)
+                    logger.info(f"Deleted {len(stale_ids)} stale vector chunks for file.")
+                except Exception as e:
+                    logger.error(f"Error deleting chunks from ChromaDB for {relative_path_str}: {e}")
+            changed_documents, changed_metadatas = [], []
+            for document, meta in zip(documents, metadatas):
+                if indexed_documents.get(self._document_id(meta)) != document:
+                    changed_documents.append(document)
+                    changed_metadatas.append(meta)
+
+        if not changed_documents:
+            logger.info(f"No new or changed chunks in {relative_path_str}. Nothing new to index.")
             return
 
-        await self.add_documents(documents, metadatas)
-        logger.info(f"Successfully re-indexed {len(documents)} chunks for file: {relative_path_str}")
+        await self.add_documents(changed_documents, changed_metadatas)
+        logger.info(f"Successfully re-indexed {len(changed_documents)} of {len(documents)} chunks for file: {relative_path_str}")
+
+    def schedule_reindex_file(self, file_path: Path, content: str) -> asyncio.Task:
+        """
+        Runs `reindex_file` as a background task so the caller can move on while
+        the embedding happens. At most four reindexes run at once.
+        """
+        return self._enqueue_reindex(file_path, content, log_errors=True)
+
+    def _enqueue_reindex(self, file_path: Path, content: str, log_errors: bool) -> asyncio.Task:
+        previous = self._latest_reindex.get(file_path)
+        task = asyncio.create_task(self._run_queued_reindex(file_path, content, previous, log_errors))
+        self._latest_reindex[file_path] = task
+        self._reindex_tasks.add(task)
+        task.add_done_callback(lambda done, path=file_path: self._forget_reindex(path, done))
+        return task
+
+    async def _run_queued_reindex(self, file_path: Path, content: str, previous: Optional[asyncio.Task],
+                                  log_errors: bool):
+        if previous is not None:
+            await asyncio.wait({previous})
+        async with self._reindex_semaphore:
+            if not log_errors:
+                await self._reindex_file(file_path, content)
+                return
+            try:
+                await self._reindex_file(file_path, content)
+            except Exception as e:
+                logger.error(f"Background re-index of {file_path} failed: {e}")
+
+    def _forget_reindex(self, file_path: Path, task: asyncio.Task):
+        self._reindex_tasks.discard(task)
+        if self._latest_reindex.get(file_path) is task:
+            del self._latest_reindex[file_path]
+
+    async def await_pending_reindex(self):
+        """Waits for every queued reindex, including those started by schedule_reindex_file."""
+        if self._reindex_tasks:
+            await asyncio.gather(*self._reindex_tasks, return_exceptions=True)
 
     async def reindex_entire_project(self):
         self._ensure_project_loaded()
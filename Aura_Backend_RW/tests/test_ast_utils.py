@@ -0,0 +1,44 @@
+# tests/test_ast_utils.py
+import ast
+
+from src.foundry.ast_utils import insert_top_level_source, node_span, splice_node
+
+SOURCE = '''class Repo:
+    def query(self):
+        """Runs the query.
+
+        more
+        """
+        sql = """SELECT *
+FROM t
+  WHERE x"""
+        return sql
+'''
+
+
+def _append_statement(content: str) -> str:
+    tree = ast.parse(content)
+    method = tree.body[0].body[0]
+    span = node_span(content, method)
+    method.body.append(ast.parse("x = 1").body[0])
+    return splice_node(content, span, method, tree)
+
+
+def test_splice_node_keeps_multiline_strings_unchanged():
+    content = _append_statement(_append_statement(SOURCE))
+
+    original = ast.parse(SOURCE).body[0].body[0]
+    edited = ast.parse(content).body[0].body[0]
+    assert ast.get_docstring(edited, clean=False) == ast.get_docstring(original, clean=False)
+    assert "        more\n        \"\"\"\n" in content
+
+    namespace = {}
+    exec(content, namespace)
+    assert namespace["Repo"]().query() == "SELECT *\nFROM t\n  WHERE x"
+    assert len(edited.body) == len(original.body) + 2
+
+
+def test_insert_top_level_source_after_last_line_without_newline():
+    content = "import os; x = 1"
+    new_code = insert_top_level_source(content, ast.parse(content), 1, "import sys")
+    assert new_code == "import os; x = 1\nimport sys\n"